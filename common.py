@@ -1,24 +1,185 @@
 #!/usr/bin/env python3
 """公共模块，包含共享的类和工具函数。"""
+import html
+import json
+import sqlite3
+import threading
 import time
+from collections.abc import MutableMapping
 from dataclasses import dataclass
 from typing import Iterable, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    # 可选依赖：orjson 是 Rust 实现的 JSON 编解码器，直接输出 UTF-8 字节；
+    # 未安装时退回标准库 json
+    import orjson
+except ImportError:
+    orjson = None
 
 
 class Requester:
-    """HTTP 请求器，带延迟控制"""
+    """HTTP 请求器，带速率控制（相邻请求的发起间隔至少为 delay 秒，线程安全）"""
+
+    POOL_SIZE = 16
     
     def __init__(self, delay: float = 0.5):
         self.session = requests.Session()
         self.delay = delay
+        self._next_allowed = 0.0
+        self._lock = threading.Lock()
+
+        # 连接池 + 自动重试：批量请求复用同一 TCP/TLS 连接
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=self.POOL_SIZE, pool_maxsize=self.POOL_SIZE,
+                              max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        })
+
+    def _throttle(self):
+        """预约下一个请求时间片，仅在距上次请求不足 delay 秒时等待"""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_allowed)
+            self._next_allowed = start + self.delay
+        if start > now:
+            time.sleep(start - now)
 
     def get(self, *args, **kwargs):
-        """发送 GET 请求，并在请求后延迟指定时间"""
-        resp = self.session.get(*args, **kwargs)
-        time.sleep(self.delay)
-        return resp
+        """发送 GET 请求；若请求本身耗时已超过 delay，则无需额外等待"""
+        self._throttle()
+        return self.session.get(*args, **kwargs)
+
+
+def find_pre_text(html_content: str, pre_id: str) -> Optional[str]:
+    """不建 DOM 树，直接从页面源码切出 <pre id="pre_id"> 的文本
+
+    找不到该块、或块内含有子标签（需要真正的 HTML 解析）时返回 None，由调用方退回完整解析
+    """
+    marker = f'id="{pre_id}"'
+    i = html_content.find(marker)
+    if i < 0:
+        return None
+    tag_start = html_content.rfind("<", 0, i)
+    if not html_content.startswith("<pre", tag_start):
+        return None
+    start = html_content.find(">", i) + 1
+    end = html_content.find("</pre>", start)
+    if start == 0 or end < 0:
+        return None
+    body = html_content[start:end]
+    if "<" in body:
+        return None
+    return html.unescape(body)
+
+
+def load_json_cache(path: str):
+    """读取 JSON 缓存文件"""
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _dump_value(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _load_value(raw: bytes):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+class CacheStore:
+    """基于 sqlite3 的本地缓存（线程安全）
+
+    每张表是一个 {键: JSON 值} 映射，按键读写单行，不需要整体加载或重写缓存文件
+    """
+
+    def __init__(self, path: str):
+        # autocommit：每次写入立即落盘；批量写入由 CacheTable.update_many 显式开启事务
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.Lock()
+        self._tables = {}
+
+    def table(self, name: str) -> "CacheTable":
+        """返回名为 name 的表，不存在时创建"""
+        if name not in self._tables:
+            with self._lock:
+                self._conn.execute(f"CREATE TABLE IF NOT EXISTS {name} (k TEXT PRIMARY KEY, v BLOB)")
+            self._tables[name] = CacheTable(self, name)
+        return self._tables[name]
+
+    def clear(self):
+        """清空所有已打开的表"""
+        for table in self._tables.values():
+            table.clear()
+
+    def _execute(self, sql: str, params=()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+
+class CacheTable(MutableMapping):
+    """CacheStore 中的一张表，按 dict 的方式使用"""
+
+    def __init__(self, store: CacheStore, name: str):
+        self._store = store
+        self._name = name
+
+    def __getitem__(self, key):
+        rows = self._store._execute(f"SELECT v FROM {self._name} WHERE k = ?", (key,))
+        if not rows:
+            raise KeyError(key)
+        return _load_value(rows[0][0])
+
+    def __setitem__(self, key, value):
+        self._store._execute(f"INSERT OR REPLACE INTO {self._name} (k, v) VALUES (?, ?)",
+                             (key, _dump_value(value)))
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._store._execute(f"DELETE FROM {self._name} WHERE k = ?", (key,))
+
+    def __contains__(self, key):
+        return bool(self._store._execute(f"SELECT 1 FROM {self._name} WHERE k = ?", (key,)))
+
+    def __iter__(self):
+        return iter([k for (k,) in self._store._execute(f"SELECT k FROM {self._name}")])
+
+    def __len__(self):
+        return self._store._execute(f"SELECT COUNT(*) FROM {self._name}")[0][0]
+
+    def items(self):
+        """一次查询返回全部 (键, 值)"""
+        return [(k, _load_value(v)) for k, v in self._store._execute(f"SELECT k, v FROM {self._name}")]
+
+    def clear(self):
+        self._store._execute(f"DELETE FROM {self._name}")
+
+    def update_many(self, mapping):
+        """在同一事务中批量写入"""
+        params = [(k, _dump_value(v)) for k, v in mapping.items()]
+        store = self._store
+        with store._lock:
+            with store._conn:
+                store._conn.execute("BEGIN")
+                store._conn.executemany(
+                    f"INSERT OR REPLACE INTO {self._name} (k, v) VALUES (?, ?)", params)
 
 
 @dataclass
@@ -37,24 +198,19 @@ class Story:
 
 def _normalize_names(names: Iterable[str]) -> List[str]:
     """去除空白并保持去重顺序"""
-    seen = set()
-    normalized: List[str] = []
-    for raw in names or []:
-        cleaned = raw.strip()
-        if not cleaned or cleaned in seen:
-            continue
-        seen.add(cleaned)
-        normalized.append(cleaned)
-    return normalized
+    cleaned = (raw.strip() for raw in names or [])
+    return list(dict.fromkeys(name for name in cleaned if name))
 
 
 def read_names_from_file(path: str) -> List[str]:
     """从文件读取名称列表"""
     try:
         with open(path, "r", encoding="utf-8") as file:
-            return _normalize_names(file.readlines())
+            # 一次读入后在 C 层按行切分，不保留行尾换行符
+            lines = file.read().splitlines()
     except OSError as exc:
         raise RuntimeError(f"读取名字文件失败: {exc}") from exc
+    return _normalize_names(lines)
 
 
 def load_names(cli_names: Iterable[str], names_file: Optional[str] = None, *, entity_label: str = "名称") -> List[str]:
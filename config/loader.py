@@ -5,15 +5,107 @@ This module provides the ParserConfig class which handles loading
 and merging configuration from various sources (YAML, JSON, dict).
 """
 
+import copy
+import importlib.util
 import json
+import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional
 
-try:
-    import yaml
-    YAML_AVAILABLE = True
-except ImportError:
-    YAML_AVAILABLE = False
+# PyYAML is imported lazily by _load_yaml_module(); only probe for it here
+YAML_AVAILABLE = importlib.util.find_spec('yaml') is not None
+_YAML_MISSING = (
+    "PyYAML is required to load YAML configuration files. "
+    "Install it with: pip install pyyaml"
+)
+_yaml = None
+_SafeLoader = None
+
+# Parsed config files keyed by (abspath, st_mtime_ns, st_size)
+_FILE_CACHE: Dict[tuple, Any] = {}
+
+# Marks a path that resolved to nothing in ParserConfig._get_cache
+_MISSING = object()
+
+
+def _load_cached(path: str, load: Callable) -> Any:
+    """Parse a config file, reusing the previous result if the file is unchanged.
+
+    Args:
+        path: Path to the configuration file
+        load: Callable that parses the file at the given path
+
+    Returns:
+        A private deep copy of the parsed data
+    """
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    if key not in _FILE_CACHE:
+        _FILE_CACHE[key] = load(path)
+    return copy.deepcopy(_FILE_CACHE[key])
+
+
+def _read_json(path: str) -> Any:
+    """Parse a JSON file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _load_yaml_module():
+    """Import PyYAML on first use and pick the fastest safe loader.
+
+    Raises:
+        ImportError: If PyYAML is not installed
+    """
+    global _yaml, _SafeLoader
+    if _yaml is None:
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError(_YAML_MISSING) from None
+        try:
+            # Prefer the libyaml C binding; fall back to the pure-Python loader
+            _SafeLoader = yaml.CSafeLoader
+        except AttributeError:
+            _SafeLoader = yaml.SafeLoader
+        _yaml = yaml
+    return _yaml
+
+
+def _read_yaml(path: str) -> Any:
+    """Parse a YAML file through its ``<path>.cache.json`` sidecar.
+
+    The sidecar is used when it is newer than the YAML file; otherwise the
+    YAML is parsed and the sidecar rewritten. The sidecar is best-effort:
+    unreadable or unwritable sidecars fall back to parsing the YAML.
+    """
+    cache_path = path + '.cache.json'
+    try:
+        if os.stat(cache_path).st_mtime_ns > os.stat(path).st_mtime_ns:
+            return _read_json(cache_path)
+    except (OSError, ValueError):
+        pass
+
+    yaml = _load_yaml_module()
+    with open(path, 'r', encoding='utf-8') as f:
+        data = yaml.load(f, Loader=_SafeLoader)
+
+    try:
+        dumped = json.dumps(data, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return data
+    # JSON would silently change e.g. non-string keys; only cache exact round-trips
+    if json.loads(dumped) != data:
+        return data
+
+    tmp_path = cache_path + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(dumped)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return data
 
 
 class ParserConfig:
@@ -55,6 +147,9 @@ class ParserConfig:
         }
     }
 
+    # DEFAULT_CONFIG is plain JSON data, so a JSON snapshot is the cheapest deep copy
+    _DEFAULT_JSON = json.dumps(DEFAULT_CONFIG)
+
     def __init__(self, config_dict: Optional[Dict[str, Any]] = None):
         """Initialize configuration.
 
@@ -62,36 +157,31 @@ class ParserConfig:
             config_dict: Optional configuration dictionary to merge with defaults
         """
         self.config = self._merge_configs(
-            self._deep_copy(self.DEFAULT_CONFIG),
+            json.loads(self._DEFAULT_JSON),
             config_dict or {}
         )
-
-    def _deep_copy(self, obj):
-        """Deep copy a dictionary."""
-        if isinstance(obj, dict):
-            return {k: self._deep_copy(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._deep_copy(item) for item in obj]
-        else:
-            return obj
+        # Resolved dotted paths; reset by invalidate_cache()
+        self._get_cache: Dict[str, Any] = {}
 
     def _merge_configs(self, base: dict, override: dict) -> dict:
-        """Deep merge two config dictionaries.
+        """Deep merge an override dictionary into a base dictionary.
+
+        ``base`` is updated in place, so callers must pass a copy they own
+        (``__init__`` passes a fresh copy of the defaults).
 
         Args:
-            base: Base configuration dictionary
+            base: Base configuration dictionary (mutated)
             override: Override configuration dictionary
 
         Returns:
-            Merged configuration dictionary
+            The merged ``base`` dictionary
         """
-        result = base.copy()
         for key, value in override.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = self._merge_configs(result[key], value)
+            if key in base and isinstance(base[key], dict) and isinstance(value, dict):
+                self._merge_configs(base[key], value)
             else:
-                result[key] = value
-        return result
+                base[key] = value
+        return base
 
     def get(self, path: str, default=None):
         """Get config value by dot-separated path.
@@ -109,17 +199,31 @@ class ParserConfig:
             >>> config.get('parsers.image.priority')
             10
         """
-        keys = path.split('.')
+        try:
+            value = self._get_cache[path]
+        except KeyError:
+            value = self._get_cache[path] = self._resolve(path)
+        return default if value is _MISSING else value
+
+    def _resolve(self, path: str):
+        """Walk the config tree for a dotted path, returning _MISSING if absent."""
         value = self.config
-        for key in keys:
+        for key in path.split('.'):
             if isinstance(value, dict):
                 value = value.get(key)
             else:
-                return default
+                return _MISSING
             if value is None:
-                return default
+                return _MISSING
         return value
 
+    def invalidate_cache(self):
+        """Forget memoized get() lookups.
+
+        Call this after mutating ``self.config`` directly.
+        """
+        self._get_cache.clear()
+
     @classmethod
     def from_yaml(cls, path: str) -> 'ParserConfig':
         """Load configuration from YAML file.
@@ -134,14 +238,11 @@ class ParserConfig:
             ImportError: If PyYAML is not installed
             FileNotFoundError: If file doesn't exist
         """
+        # Only probe here: a fresh .cache.json sidecar or a cached parse
+        # means PyYAML need not be imported at all
         if not YAML_AVAILABLE:
-            raise ImportError(
-                "PyYAML is required to load YAML configuration files. "
-                "Install it with: pip install pyyaml"
-            )
-
-        with open(path, 'r', encoding='utf-8') as f:
-            config_dict = yaml.safe_load(f)
+            raise ImportError(_YAML_MISSING)
+        config_dict = _load_cached(path, _read_yaml)
         return cls(config_dict)
 
     @classmethod
@@ -158,8 +259,7 @@ class ParserConfig:
             FileNotFoundError: If file doesn't exist
             json.JSONDecodeError: If JSON is invalid
         """
-        with open(path, 'r', encoding='utf-8') as f:
-            config_dict = json.load(f)
+        config_dict = _load_cached(path, _read_json)
         return cls(config_dict)
 
     @classmethod
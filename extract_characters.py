@@ -13,37 +13,67 @@ extract_characters.py
 输出:
     将提取到的角色名列表输出到控制台，每行一个角色名。
 """
+import mmap
+import os
 import re
 import sys
-from collections import OrderedDict
+
+# 匹配 [name="角色名"] 与缺少开括号的 name="角色名"]（前者是后者的子集）；
+# 用于字节输入（如内存映射的文件），字符串输入走 _iter_names 的 str.find 扫描
+_NAME_RE_B = re.compile(rb'name\s*=\s*"([^"]+)"\]')
+
+
+def _iter_names(text):
+    """按 name\\s*=\\s*"角色名"] 的规则逐个产出角色名（未去除空白）。
+
+    与正则等价，但只用 str.find 定位字面量，省去正则引擎的逐字符回溯。
+    """
+    find = text.find
+    n = len(text)
+    pos = 0
+    while True:
+        i = find('name', pos)
+        if i < 0:
+            return
+        pos = i + 4
+        k = pos
+        while k < n and text[k].isspace():
+            k += 1
+        if k >= n or text[k] != '=':
+            continue
+        k += 1
+        while k < n and text[k].isspace():
+            k += 1
+        if k >= n or text[k] != '"':
+            continue
+        j = find('"', k + 1)
+        if j < 0:
+            return
+        # 角色名至少一个字符，且结尾引号后必须紧跟 ]
+        if j == k + 1 or text[j + 1:j + 2] != ']':
+            continue
+        yield text[k + 1:j]
+        pos = j + 2
 
 
 def extract_characters(text):
     """从文本中提取所有角色名。
     
     Args:
-        text: 待解析的文本字符串
+        text: 待解析的文本字符串，或 UTF-8 编码的 bytes/bytearray/mmap
         
     Returns:
-        去重后的角色名列表（保持出现顺序）
+        去重后的角色名列表（保持出现顺序，字符串已通过 sys.intern 驻留）
     """
-    characters = OrderedDict()  # 使用 OrderedDict 保持顺序并去重
-    
-    # 模式1: [name="角色名"]对话内容
-    pattern1 = r'\[name\s*=\s*"([^"]+)"\]'
-    
-    # 模式2: name="角色名"]对话内容 (缺少开括号)
-    pattern2 = r'name\s*=\s*"([^"]+)"\]'
-    
-    # 匹配所有角色名
-    for pattern in [pattern1, pattern2]:
-        matches = re.findall(pattern, text)
-        for match in matches:
-            character = match.strip()
-            if character:  # 忽略空字符串
-                characters[character] = True
-    
-    return list(characters.keys())
+    # 单次扫描即可覆盖 [name="角色名"] 与 name="角色名"] 两种写法；
+    # dict 保持插入顺序，dict.fromkeys 完成去重（忽略空字符串）
+    if isinstance(text, str):
+        stripped = (match.strip() for match in _iter_names(text))
+    else:
+        # 模式的固定部分均为 ASCII，可直接在字节上匹配，只解码捕获到的角色名
+        stripped = (m.group(1).decode('utf-8').strip() for m in _NAME_RE_B.finditer(text))
+    # 驻留去重后的名字：跨文件累积结果时同名只保留一份，后续比较可走指针快速路径
+    return [sys.intern(name) for name in dict.fromkeys(name for name in stripped if name)]
 
 
 def extract_characters_from_file(filepath):
@@ -56,9 +86,13 @@ def extract_characters_from_file(filepath):
         角色名列表
     """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            text = f.read()
-        return extract_characters(text)
+        with open(filepath, 'rb') as f:
+            # mmap 不支持空文件
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            # 通过 mmap 按需换页扫描，避免把整个文件读入内存再解码
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return extract_characters(mm)
     except FileNotFoundError:
         print(f'错误: 文件 "{filepath}" 不存在', file=sys.stderr)
         sys.exit(1)
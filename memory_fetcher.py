@@ -14,24 +14,29 @@ main.py
 import argparse
 import os
 import sys
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
 
-from common import load_names
+from common import Requester, Story, load_names
 from search_memory import PRTSClient
 from parse_text_to_docx import DocumentAssembler
 
+def fetch_stories(client: PRTSClient, names: List[str], max_workers: int = 1) -> Dict[str, List[Story]]:
+    """获取多个角色的密录，返回 {角色名: [Story]}（保持 names 顺序，重复的名字只请求一次）
 
-def save_per_character(client: PRTSClient, name: str, out_dir: str, verbose: bool):
-    stories = client.get_story_content_by_name(name)
+    max_workers 大于 1 时并发下载（网络 I/O 期间会释放 GIL）。
+    """
+    return client.get_story_contents_by_names(names, max_workers=max_workers)
+
+
+def write_character_doc(name: str, stories: List[Story], out_dir: str, verbose: bool):
+    """将单个角色的密录写入 docx（顶层函数，可在子进程中执行）"""
     if not stories:
         if verbose:
             print(f"未找到 `{name}` 的密录，跳过")
         return 0
 
-    # ensure output dir
-    os.makedirs(out_dir, exist_ok=True)
-    outpath = os.path.join(out_dir, f"{name}_memory.docx")
-
+    # out_dir 由调用方预先创建（main 中只创建一次）
     asm = DocumentAssembler()
     included = 0
     for idx, s in enumerate(stories, start=1):
@@ -45,17 +50,22 @@ def save_per_character(client: PRTSClient, name: str, out_dir: str, verbose: boo
                 print(f"{name} 的条目 `{title}` 内容为空，已跳过")
 
     if included > 0:
+        outpath = os.path.join(out_dir, f"{name}_memory.docx")
         asm.save(outpath)
         if verbose:
             print(f"已为 `{name}` 生成: {outpath} （包含 {included} 条密录）")
     return included
 
 
-def save_combined(client: PRTSClient, names: List[str], outpath: str, verbose: bool):
+def save_combined(client: PRTSClient, names: List[str], outpath: str, verbose: bool,
+                  stories_by_name: Optional[Dict[str, List[Story]]] = None):
     asm = DocumentAssembler()
     total_included = 0
     for name in names:
-        stories = client.get_story_content_by_name(name)
+        if stories_by_name is not None:
+            stories = stories_by_name.get(name)
+        else:
+            stories = client.get_story_content_by_name(name)
         if not stories:
             if verbose:
                 print(f"未找到 `{name}` 的密录，跳过")
@@ -95,7 +105,10 @@ def main():
     parser.add_argument("-f", "--names-file", help="从文件读取角色名，每行一个")
     parser.add_argument("--combined", action="store_true", help="将所有角色的密录合并到一个 docx 文件（默认按角色单独生成）")
     parser.add_argument("-o", "--out", help="输出文件或目录。若 --combined 则为输出文件路径，否则为输出目录（默认: 当前目录）")
-    parser.add_argument("--no-cache", action="store_true", help="不使用本地缓存，强制从服务器拉取")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="重新获取 Cookie 与密录正文，密录列表只增量拉取新增或改动的干员")
+    parser.add_argument("--full-refresh", action="store_true", help="清空全部本地缓存，强制从服务器全量拉取")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="并发下载密录的线程数（默认: 1，即顺序下载）")
     parser.add_argument("-v", "--verbose", action="store_true", help="显示更多调试信息")
     args = parser.parse_args()
 
@@ -103,14 +116,20 @@ def main():
         names = load_names(args.names, args.names_file, entity_label="角色名")
     except (RuntimeError, ValueError) as exc:
         parser.error(str(exc))
+    # 命令行与 -f 文件中可能出现同一个名字，只处理一次
+    names = list(dict.fromkeys(names))
 
-    client = PRTSClient(use_cache=not args.no_cache)
+    # 所有请求共用同一个 Requester（同一连接池与速率控制）
+    requester = Requester()
+    client = PRTSClient(use_cache=not args.no_cache, requester=requester, full_refresh=args.full_refresh)
 
     # 如果用户请求合并输出
     if args.combined:
         outpath = args.out if args.out else "combined_memory.docx"
         try:
-            count = save_combined(client, names, outpath, verbose=args.verbose)
+            stories_by_name = fetch_stories(client, names, max_workers=args.jobs)
+            count = save_combined(client, names, outpath, verbose=args.verbose,
+                                  stories_by_name=stories_by_name)
             if count == 0:
                 sys.exit(3)
         except Exception as e:
@@ -120,13 +139,33 @@ def main():
 
     # per-character 输出（默认）
     out_dir = args.out if args.out else os.getcwd()
+    os.makedirs(out_dir, exist_ok=True)
+    try:
+        stories_by_name = fetch_stories(client, names, max_workers=args.jobs)
+    except Exception as e:
+        print("获取密录出错:", e)
+        sys.exit(4)
+
+    # docx 组装受 GIL 限制，多个角色时分发到多个进程并行生成
     total = 0
-    for name in names:
-        try:
-            c = save_per_character(client, name, out_dir, verbose=args.verbose)
-            total += c
-        except Exception as e:
-            print(f"为 `{name}` 生成文件出错:", e)
+    workers = min(len(names), os.cpu_count() or 1)
+    if workers <= 1:
+        for name in names:
+            try:
+                total += write_character_doc(name, stories_by_name[name], out_dir, args.verbose)
+            except Exception as e:
+                print(f"为 `{name}` 生成文件出错:", e)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futures = {
+                name: ex.submit(write_character_doc, name, stories_by_name[name], out_dir, args.verbose)
+                for name in names
+            }
+            for name, future in futures.items():
+                try:
+                    total += future.result()
+                except Exception as e:
+                    print(f"为 `{name}` 生成文件出错:", e)
 
     if total == 0:
         print("未生成任何文件（可能未找到匹配的密录）。")
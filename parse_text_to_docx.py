@@ -12,17 +12,20 @@ parse_test_to_docx.py
 
 依赖: python-docx
 """
+import os
 import re
 import sys
 import io
 import hashlib
+from copy import deepcopy
 from typing import Optional
 from docx import Document
+from docx.document import _Body
 from docx.shared import Pt, Inches, RGBColor
+from docx.enum.style import WD_STYLE_TYPE
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
-import requests
+from docx.oxml.ns import qn, nsdecls
+from docx.oxml import OxmlElement, parse_xml
 
 # Import modular parser system
 from parsers.registry import ParserRegistry
@@ -38,11 +41,66 @@ from parsers.narration_parser import NarrationParser
 from config.loader import ParserConfig
 
 
-def _set_font(run, font_name: str, size: float) -> None:
-    """设置中文字体"""
-    run.font.name = font_name
-    run._element.rPr.rFonts.set(qn('w:eastAsia'), font_name)
-    run.font.size = Pt(size)
+# parse_line / add_sound_effect 使用的辅助正则，模块加载时编译一次
+_SOUND_KEY_RE = re.compile(r'key\s*=\s*"?([^",\)\]]+)"?')
+_CMD_RE = re.compile(r'\[?\s*([A-Za-z_][A-Za-z0-9_]*)')
+_RESOURCE_ID_RE = re.compile(r'^\$?[A-Za-z0-9_\-/\$]+$')
+
+# 没有 key= 的音效类指令中，识别但不输出的指令名（小写）
+_SKIP_DIRECTIVES = frozenset({
+    'stopsound', 'stopmusic', 'soundvolume', 'blocker', 'delay',
+    'background', 'image', 'imagetween', 'curtain', 'camerashake', 'cameraeffect',
+    'focusout', 'bgeffect', 'charslot', 'dialog', 'subtitle', 'animtextclean',
+    'animtext', 'playsound', 'playmusic'
+})
+
+_QN_EASTASIA = qn('w:eastAsia')
+_QN_SECTPR = qn('w:sectPr')
+_QN_FLDCHARTYPE = qn('w:fldCharType')
+_QN_XML_SPACE = qn('xml:space')
+
+# 并发下载图片的线程数
+IMAGE_FETCH_WORKERS = 16
+
+# 正文中反复使用的字符样式：样式 ID -> (字体, 字号, 粗体)。
+# create_document 为每个文档创建一次，之后每个 run 只需引用样式 ID，
+# 不必逐个写入字体/字号/粗体属性。
+_CHAR_STYLES = {
+    'Song85': ('宋体', 8.5, False),
+    'Song85Bold': ('宋体', 8.5, True),
+    'Song9': ('宋体', 9, False),
+    'Kai85': ('楷体', 8.5, False),
+    'Hei12Bold': ('黑体', 12, True),
+    'Hei14Bold': ('黑体', 14, True),
+    'Hei18Bold': ('黑体', 18, True),
+    'Hei22Bold': ('黑体', 22, True),
+}
+
+# 每个字符样式预先解析好的 <w:rPr><w:rStyle/></w:rPr> 模板，新建的 run 直接复制一份插入
+_RPR_TEMPLATES = {
+    style_id: parse_xml(f'<w:rPr {nsdecls("w")}><w:rStyle w:val="{style_id}"/></w:rPr>')
+    for style_id in _CHAR_STYLES
+}
+
+
+def _apply_char_style(run, style_id: str) -> None:
+    """为 run 引用 create_document 中预建的字符样式（见 _CHAR_STYLES）"""
+    r = run._r
+    if r.rPr is None:
+        # rPr 必须是 w:r 的第一个子元素
+        r.insert(0, deepcopy(_RPR_TEMPLATES[style_id]))
+    else:
+        r.style = style_id
+
+
+def _add_char_styles(doc: Document) -> None:
+    """在文档中创建 _CHAR_STYLES 定义的字符样式"""
+    for style_id, (font_name, size, bold) in _CHAR_STYLES.items():
+        style = doc.styles.add_style(style_id, WD_STYLE_TYPE.CHARACTER)
+        style.font.name = font_name
+        style.font.size = Pt(size)
+        style.font.bold = bold
+        style.element.rPr.rFonts.set(_QN_EASTASIA, font_name)
 
 
 def _set_paragraph_format(p, line_spacing: float = 1.5, space_before: float = 0, 
@@ -91,13 +149,15 @@ def create_document(page_size='A4', margin_size='normal') -> Document:
     style = doc.styles['Normal']
     style.font.name = '宋体'
     style.font.size = Pt(12)
-    style._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
+    style._element.rPr.rFonts.set(_QN_EASTASIA, '宋体')
     # 默认段落格式：行距1.5倍，左对齐，段前段后0
     style.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.LEFT
     style.paragraph_format.line_spacing = 1.5
     style.paragraph_format.space_before = Pt(0)
     style.paragraph_format.space_after = Pt(0)
 
+    _add_char_styles(doc)
+
     return doc
 
 
@@ -131,14 +191,14 @@ def add_page_numbers(doc: Document, position='bottom', alignment='center'):
 
         # 创建页码字段的 XML 元素
         fldChar1 = OxmlElement('w:fldChar')
-        fldChar1.set(qn('w:fldCharType'), 'begin')
+        fldChar1.set(_QN_FLDCHARTYPE, 'begin')
 
         instrText = OxmlElement('w:instrText')
-        instrText.set(qn('xml:space'), 'preserve')
+        instrText.set(_QN_XML_SPACE, 'preserve')
         instrText.text = 'PAGE'
 
         fldChar2 = OxmlElement('w:fldChar')
-        fldChar2.set(qn('w:fldCharType'), 'end')
+        fldChar2.set(_QN_FLDCHARTYPE, 'end')
 
         run._element.append(fldChar1)
         run._element.append(instrText)
@@ -149,13 +209,35 @@ def add_page_numbers(doc: Document, position='bottom', alignment='center'):
         run.font.name = '宋体'
 
 
+def _new_staging_body(doc: Document) -> _Body:
+    """创建脱离文档树的暂存 body，可代替 doc 传给 add_* 系列函数。
+
+    doc.add_paragraph 每次都要在整个 body 的子节点中线性查找 sectPr，
+    文档越长越慢；先写入暂存 body，再由 _flush_staging_body 一次性插入。
+    """
+    return _Body(OxmlElement('w:body'), doc)
+
+
+def _flush_staging_body(doc: Document, staging: _Body) -> None:
+    """将暂存 body 中的段落按顺序移动到 doc 正文末尾（sectPr 之前）"""
+    children = list(staging._body)
+    if not children:
+        return
+    body = doc.element.body
+    last = body[-1] if len(body) else None
+    if last is not None and last.tag == _QN_SECTPR:
+        for child in children:
+            last.addprevious(child)
+    else:
+        body.extend(children)
+
+
 def add_main_title(doc: Document, text: str) -> None:
     """添加大标题（如"反常光谱"）：左对齐、大字号、粗体"""
     p = doc.add_paragraph()
     p.alignment = WD_ALIGN_PARAGRAPH.LEFT
     run = p.add_run(text)
-    run.font.bold = True
-    _set_font(run, '黑体', 22)
+    _apply_char_style(run, 'Hei22Bold')
     _set_paragraph_format(p)
 
 
@@ -164,8 +246,7 @@ def add_scene_title(doc: Document, text: str) -> None:
     p = doc.add_paragraph()
     p.alignment = WD_ALIGN_PARAGRAPH.LEFT
     run = p.add_run(text)
-    run.font.bold = True
-    _set_font(run, '黑体', 14)
+    _apply_char_style(run, 'Hei14Bold')
     _set_paragraph_format(p)
 
 
@@ -174,8 +255,7 @@ def add_scene_timestamp(doc: Document, text: str) -> None:
     p = doc.add_paragraph()
     p.alignment = WD_ALIGN_PARAGRAPH.LEFT
     run = p.add_run(text)
-    run.font.bold = True
-    _set_font(run, '黑体', 12)
+    _apply_char_style(run, 'Hei12Bold')
     _set_paragraph_format(p)
 
 
@@ -187,11 +267,10 @@ def add_dialogue(doc: Document, character: str, text: str) -> None:
     p = doc.add_paragraph()
     p.alignment = WD_ALIGN_PARAGRAPH.LEFT
     char_run = p.add_run(f"{character}:")
-    char_run.font.bold = True
-    _set_font(char_run, '宋体', 8.5)
+    _apply_char_style(char_run, 'Song85Bold')
     
     text_run = p.add_run(text)
-    _set_font(text_run, '宋体', 8.5)
+    _apply_char_style(text_run, 'Song85')
     _set_paragraph_format(p)
 
 
@@ -200,7 +279,7 @@ def add_narration(doc: Document, text: str) -> None:
     p = doc.add_paragraph()
     p.alignment = WD_ALIGN_PARAGRAPH.LEFT
     run = p.add_run(text)
-    _set_font(run, '楷体', 8.5)
+    _apply_char_style(run, 'Kai85')
     _set_paragraph_format(p, first_line_indent=0.28)
 
 
@@ -213,9 +292,8 @@ def add_image_reference(doc: Document, image_index: int):
     p = doc.add_paragraph()
     p.alignment = WD_ALIGN_PARAGRAPH.LEFT
     run = p.add_run(f"[图片: 图片{image_index}]")
-    run.font.bold = True
     run.font.color.rgb = RGBColor(128, 128, 128)  # 灰色
-    _set_font(run, '宋体', 8.5)
+    _apply_char_style(run, 'Song85Bold')
     _set_paragraph_format(p)
     return run
 
@@ -232,6 +310,12 @@ def add_decision(doc: Document, options: list[str]) -> None:
     pass
 
 
+def _option_text(options_map: dict, ref: str) -> str:
+    """取选项文本；仅在查不到时才拼接 "选项N" 占位文本"""
+    text = options_map.get(ref)
+    return text if text is not None else f"选项{ref}"
+
+
 def add_predicate_header(doc: Document, references: str, options_map: dict) -> None:
     """添加分支标题
 
@@ -244,37 +328,63 @@ def add_predicate_header(doc: Document, references: str, options_map: dict) -> N
     # 构建分支标题文本（简洁样式，不占用整行）
     if len(refs) == 1:
         # 单个选项分支
-        option_text = options_map.get(refs[0], f"选项{refs[0]}")
+        option_text = _option_text(options_map, refs[0])
         title = f"[→ {option_text}]"
     elif len(refs) == len(options_map):
         # 汇合分支
         title = "[→ 汇合]"
     else:
         # 多个选项的共同分支
-        option_texts = [options_map.get(r, f"选项{r}") for r in refs]
+        option_texts = [_option_text(options_map, r) for r in refs]
         title = f"[→ {' & '.join(option_texts)}]"
 
     p = doc.add_paragraph()
     p.alignment = WD_ALIGN_PARAGRAPH.LEFT
     run = p.add_run(title)
-    run.font.bold = True
     run.font.color.rgb = RGBColor(0, 255, 255)  # 青色
-    _set_font(run, '宋体', 8.5)
+    _apply_char_style(run, 'Song85Bold')
     _set_paragraph_format(p)
     p.paragraph_format.space_before = Pt(6)
     p.paragraph_format.space_after = Pt(6)
 
 
+def _fetch_image(session, url: str):
+    """流式下载图片，边接收边计算哈希。
+
+    哈希仅用于内容去重，无需密码学强度，使用比 SHA-256 更快的 BLAKE2b-128。
+    返回 (摘要 bytes, BytesIO, None)；失败时返回 (None, None, 异常)。
+    """
+    try:
+        with session.get(url, stream=True, timeout=10) as response:
+            response.raise_for_status()
+            digest = hashlib.blake2b(digest_size=16)
+            buf = io.BytesIO()
+            for chunk in response.iter_content(65536):
+                digest.update(chunk)
+                buf.write(chunk)
+        return digest.digest(), buf, None
+    except Exception as e:
+        return None, None, e
+
+
 def _add_sound_effect_paragraph(doc: Document, text: str) -> bool:
     """添加音效段落的内部辅助函数"""
     p = doc.add_paragraph()
     p.alignment = WD_ALIGN_PARAGRAPH.LEFT
     run = p.add_run(f"<{text}>")
-    _set_font(run, '楷体', 8.5)
+    _apply_char_style(run, 'Kai85')
     _set_paragraph_format(p)
     return True
 
 
+def _has_cjk(text: str) -> bool:
+    """判断文本中是否含有 CJK 统一汉字（U+4E00–U+9FFF）。
+
+    纯 ASCII 文本（资源 id 等）由 str.isascii 在 C 层直接排除，无需逐字扫描。
+    """
+    return not text.isascii() and any('\u4e00' <= c <= '\u9fff' for c in text)
+
+
 def add_sound_effect(doc: Document, text: str) -> bool:
     """尝试将音效/音乐文本写入文档。
 
@@ -283,11 +393,11 @@ def add_sound_effect(doc: Document, text: str) -> bool:
     返回 True 表示写入了 doc，False 表示已跳过（但此类行视为已识别，不会再计为未识别行）。
     """
     # 如果包含中文字符则视为描述性音效，写入
-    if re.search(r'[\u4e00-\u9fff]', text):
+    if _has_cjk(text):
         return _add_sound_effect_paragraph(doc, text)
 
     # 如果以 $ 开头或只包含 ASCII/下划线/连字符/斜杠/美元符号, 则认为是资源 id，跳过输出
-    if re.match(r'^\$?[A-Za-z0-9_\-/\$]+$', text):
+    if _RESOURCE_ID_RE.match(text):
         return False
 
     # 其它情况较可能是描述性，写入
@@ -304,6 +414,19 @@ class DocumentAssembler:
         asm.save('out.docx')
     """
 
+    # Map parser names to classes
+    _PARSER_CLASSES = {
+        'control': ControlParser,
+        'image': ImageParser,
+        'decision': DecisionParser,
+        'predicate': PredicateParser,
+        'scene': SceneParser,
+        'subtitle': SubtitleParser,
+        'dialogue': DialogueParser,
+        'sound': SoundParser,
+        'narration': NarrationParser,
+    }
+
     def __init__(self, config: ParserConfig = None):
         """初始化文档组装器
 
@@ -329,6 +452,7 @@ class DocumentAssembler:
         # Set context
         self.registry.context.doc = self.doc
         self.registry.context.assembler = self
+        self.registry.initialize_all()
 
         # Internal state
         self.skipped_lines = []
@@ -343,27 +467,17 @@ class DocumentAssembler:
         self.image_map = {}
         self.images_to_append = []
         self.image_counter = 0
-        self.image_reference_runs = {}
+        self.image_reference_runs = []  # 第 N 个图片引用的 run 位于下标 N-1
+
+        # 图片下载共用的 Session，首次需要下载图片时才创建（见 _image_session）
+        self._http = None
 
     def _setup_parsers(self):
         """Setup parsers based on configuration"""
         parser_configs = self.config.get('parsers', {})
 
-        # Map parser names to classes
-        parser_classes = {
-            'control': ControlParser,
-            'image': ImageParser,
-            'decision': DecisionParser,
-            'predicate': PredicateParser,
-            'scene': SceneParser,
-            'subtitle': SubtitleParser,
-            'dialogue': DialogueParser,
-            'sound': SoundParser,
-            'narration': NarrationParser,
-        }
-
         # Register parsers
-        for name, parser_class in parser_classes.items():
+        for name, parser_class in self._PARSER_CLASSES.items():
             cfg = parser_configs.get(name, {})
             enabled = cfg.get('enabled', True)
             priority = cfg.get('priority', 50)
@@ -384,18 +498,7 @@ class DocumentAssembler:
         Args:
             parser_name: Name of the parser ('image', 'decision', etc.)
         """
-        parser_classes = {
-            'control': ControlParser,
-            'image': ImageParser,
-            'decision': DecisionParser,
-            'predicate': PredicateParser,
-            'scene': SceneParser,
-            'subtitle': SubtitleParser,
-            'dialogue': DialogueParser,
-            'sound': SoundParser,
-            'narration': NarrationParser,
-        }
-        parser_class = parser_classes.get(parser_name)
+        parser_class = self._PARSER_CLASSES.get(parser_name)
         if parser_class:
             self.registry.enable_parser(parser_class)
 
@@ -405,18 +508,7 @@ class DocumentAssembler:
         Args:
             parser_name: Name of the parser ('image', 'decision', etc.)
         """
-        parser_classes = {
-            'control': ControlParser,
-            'image': ImageParser,
-            'decision': DecisionParser,
-            'predicate': PredicateParser,
-            'scene': SceneParser,
-            'subtitle': SubtitleParser,
-            'dialogue': DialogueParser,
-            'sound': SoundParser,
-            'narration': NarrationParser,
-        }
-        parser_class = parser_classes.get(parser_name)
+        parser_class = self._PARSER_CLASSES.get(parser_name)
         if parser_class:
             self.registry.disable_parser(parser_class)
 
@@ -443,8 +535,7 @@ class DocumentAssembler:
         p.alignment = WD_ALIGN_PARAGRAPH.LEFT
         display_text = f"{character}{title}" if character else title
         run = p.add_run(display_text)
-        run.font.bold = True
-        _set_font(run, '黑体', 18)
+        _apply_char_style(run, 'Hei18Bold')
         _set_paragraph_format(p)
 
     def parse_lines(self, lines, title: str = None, character: str = None, spacer_lines: int = None, image_map: dict = None):
@@ -457,12 +548,18 @@ class DocumentAssembler:
         image_map: 图片映射 {image_id: image_url}
         Returns the list of skipped lines accumulated so far.
         """
+        self._parse_section(lines, title=title, character=character,
+                            spacer_lines=spacer_lines, image_map=image_map)
+        return list(self.skipped_lines)
+
+    def _parse_section(self, lines, title: str = None, character: str = None, spacer_lines: int = None, image_map: dict = None):
+        """parse_lines 的实现，不复制 skipped_lines"""
         # 设置图片映射
         if image_map:
             self.image_map = image_map
 
-        # Initialize parsers
-        self.registry.initialize_all()
+        # Reset per-section parser state (parsers are initialized once in __init__)
+        self.registry.reset_section()
 
         if title:
             n = spacer_lines if spacer_lines is not None else self.spacer_lines
@@ -474,17 +571,20 @@ class DocumentAssembler:
             # 标记已添加首个章节
             self._first_section = False
 
-        # Parse lines using the registry
-        for raw in lines:
-            handled = self.registry.parse_line(raw)
-            if not handled:
-                self.skipped_lines.append(raw.rstrip('\n'))
+        # Parse lines using the registry; body paragraphs are staged and
+        # spliced into the document in one step
+        staging = _new_staging_body(self.doc)
+        self.registry.context.doc = staging
+        try:
+            unhandled = self.registry.parse_lines(lines)
+            self.skipped_lines.extend(raw.rstrip('\n') for raw in unhandled)
+        finally:
+            self.registry.context.doc = self.doc
+            _flush_staging_body(self.doc, staging)
 
         # Finalize parsers
         self.registry.finalize_all()
 
-        return list(self.skipped_lines)
-
     def parse_text(self, text: str, title: str = None, character: str = None, spacer_lines: int = None, main_title: str = None, image_map: dict = None):
         """Parse text string and append to internal document.
 
@@ -494,7 +594,31 @@ class DocumentAssembler:
         """
         if main_title:
             self.add_main_title(main_title)
-        return self.parse_lines(text.splitlines(), title=title, character=character, spacer_lines=spacer_lines, image_map=image_map)
+        # 逐行迭代，不预先生成整个行列表；newline=None 与 splitlines 一样识别 \r\n 和 \r
+        return self.parse_lines(io.StringIO(text, newline=None), title=title, character=character, spacer_lines=spacer_lines, image_map=image_map)
+
+    def parse_texts(self, entries):
+        """依次解析多段文本，entries 为 (title, text, image_map) 的可迭代对象
+
+        与逐段调用 parse_text 等价，但只在最后返回一次 skipped_lines 的副本
+        """
+        for title, text, image_map in entries:
+            self._parse_section(io.StringIO(text, newline=None), title=title, image_map=image_map)
+        return list(self.skipped_lines)
+
+    def _image_session(self):
+        """返回图片下载共用的 Session（keep-alive 连接池，容量与下载线程数一致）。
+
+        requests 及其依赖导入较慢，而大多数文档并不含图片，因此延迟到这里才导入。
+        """
+        if self._http is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            self._http = requests.Session()
+            adapter = HTTPAdapter(pool_connections=IMAGE_FETCH_WORKERS, pool_maxsize=IMAGE_FETCH_WORKERS)
+            self._http.mount('https://', adapter)
+            self._http.mount('http://', adapter)
+        return self._http
 
     def append_images(self):
         """在文档末尾追加所有图片"""
@@ -505,42 +629,45 @@ class DocumentAssembler:
         output_entries = []
         final_counter = 0
 
-        for image_index, image_url in self.images_to_append:
-            try:
-                response = requests.get(image_url, timeout=10)
-                response.raise_for_status()
-                content = response.content
-                image_hash = hashlib.sha256(content).hexdigest()
+        from concurrent.futures import ThreadPoolExecutor
 
-                if image_hash in hash_to_final_index:
-                    index_map[image_index] = hash_to_final_index[image_hash]
-                    continue
+        # 并发下载所有图片，再按原顺序去重并编号
+        session = self._image_session()
+        urls = [image_url for _, image_url in self.images_to_append]
+        with ThreadPoolExecutor(max_workers=min(IMAGE_FETCH_WORKERS, len(urls))) as ex:
+            fetched = list(ex.map(lambda url: _fetch_image(session, url), urls))
 
-                final_counter += 1
-                image_stream = io.BytesIO(content)
-                output_entries.append({
-                    'type': 'image',
-                    'final_index': final_counter,
-                    'image_stream': image_stream,
-                    'image_url': image_url,
-                })
-                hash_to_final_index[image_hash] = final_counter
-                index_map[image_index] = final_counter
-            except Exception as e:
+        for (image_index, image_url), (image_hash, image_stream, error) in zip(self.images_to_append, fetched):
+            if error is not None:
                 final_counter += 1
                 output_entries.append({
                     'type': 'error',
                     'final_index': final_counter,
                     'image_url': image_url,
-                    'error': str(e),
+                    'error': str(error),
                 })
                 index_map[image_index] = final_counter
+                continue
+
+            if image_hash in hash_to_final_index:
+                index_map[image_index] = hash_to_final_index[image_hash]
+                continue
+
+            final_counter += 1
+            output_entries.append({
+                'type': 'image',
+                'final_index': final_counter,
+                'image_stream': image_stream,
+                'image_url': image_url,
+            })
+            hash_to_final_index[image_hash] = final_counter
+            index_map[image_index] = final_counter
 
         if not output_entries:
             return
 
         # 更新正文中的图片引用编号
-        for original_index, run in self.image_reference_runs.items():
+        for original_index, run in enumerate(self.image_reference_runs, 1):
             final_index = index_map.get(original_index)
             if final_index:
                 run.text = f"[图片: 图片{final_index}]"
@@ -552,8 +679,7 @@ class DocumentAssembler:
         p = self.doc.add_paragraph()
         p.alignment = WD_ALIGN_PARAGRAPH.CENTER
         run = p.add_run("━━━ 图片 ━━━")
-        run.font.bold = True
-        _set_font(run, '黑体', 14)
+        _apply_char_style(run, 'Hei14Bold')
         _set_paragraph_format(p)
         p.paragraph_format.space_before = Pt(12)
         p.paragraph_format.space_after = Pt(12)
@@ -572,7 +698,7 @@ class DocumentAssembler:
                 p.alignment = WD_ALIGN_PARAGRAPH.CENTER
                 run = p.add_run(f"图片{entry['final_index']}")
                 run.font.color.rgb = RGBColor(128, 128, 128)
-                _set_font(run, '宋体', 9)
+                _apply_char_style(run, 'Song9')
                 _set_paragraph_format(p)
                 p.paragraph_format.space_after = Pt(18)
             else:
@@ -583,7 +709,7 @@ class DocumentAssembler:
                 run = p.add_run(f"[图片{entry['final_index']} 加载失败: {entry['image_url']}]"
                                 f"{suffix}")
                 run.font.color.rgb = RGBColor(255, 0, 0)
-                _set_font(run, '宋体', 9)
+                _apply_char_style(run, 'Song9')
                 _set_paragraph_format(p)
                 p.paragraph_format.space_after = Pt(18)
 
@@ -599,136 +725,169 @@ class DocumentAssembler:
         return list(self.skipped_lines)
 
 
-def parse_line(line: str, doc: Document, assembler=None) -> bool:
-    """解析一行并将可识别内容写入 doc。
+def _handle_image(m, line: str, doc: Document, assembler) -> bool:
+    # [Image(image="27_i01")]
+    image_id = m.group('image_id').strip()
+    # 查找图片 URL
+    if image_id in assembler.image_map:
+        assembler.image_counter += 1
+        image_url = assembler.image_map[image_id]
+        # 在正文中添加图片索引
+        assembler.image_reference_runs.append(add_image_reference(doc, assembler.image_counter))
+        # 记录待追加的图片
+        assembler.images_to_append.append((assembler.image_counter, image_url))
+    return True
 
-    返回 True 表示该行被识别并处理，返回 False 表示该行未被识别（将被跳过）。
-    assembler: DocumentAssembler 实例，用于维护选择支和图片状态
-    """
-    line = line.strip()
-    if not line:
-        return False
 
-    # Image: 图片
-    # [Image(image="27_i01")]
-    m = re.search(r'Image\(image\s*=\s*"([^"]+)"', line, re.IGNORECASE)
-    if m and assembler:
-        image_id = m.group(1).strip()
-        # 查找图片 URL
-        if image_id in assembler.image_map:
-            assembler.image_counter += 1
-            image_url = assembler.image_map[image_id]
-            # 在正文中添加图片索引
-            run = add_image_reference(doc, assembler.image_counter)
-            assembler.image_reference_runs[assembler.image_counter] = run
-            # 记录待追加的图片
-            assembler.images_to_append.append((assembler.image_counter, image_url))
-        return True
-
-    # Decision: 选择支
+def _handle_decision(m, line: str, doc: Document, assembler) -> bool:
     # [Decision(options="选项1;选项2;...", values="1;2;...")]
-    m = re.search(r'Decision\(options\s*=\s*"([^"]+)".*?values\s*=\s*"([^"]+)"', line, re.IGNORECASE)
-    if m:
-        options_str = m.group(1)
-        values_str = m.group(2)
-        options = options_str.split(';')
-        values = values_str.split(';')
+    options = m.group('dec_options').split(';')
+    values = m.group('dec_values').split(';')
+
+    # 保存选择支状态
+    if assembler:
+        # 选项编号是短数字串，intern 后各分支的查找共享同一个 key 对象
+        assembler.current_decision_options = {sys.intern(v.strip()): o.strip() for v, o in zip(values, options)}
+        assembler.current_predicate = None
 
-        # 保存选择支状态
-        if assembler:
-            assembler.current_decision_options = {v.strip(): o.strip() for v, o in zip(values, options)}
-            assembler.current_predicate = None
+    # 显示选择支
+    add_decision(doc, options)
+    return True
 
-        # 显示选择支
-        add_decision(doc, options)
-        return True
 
-    # Predicate: 分支标记
+def _handle_predicate(m, line: str, doc: Document, assembler) -> bool:
     # [Predicate(references="1")] 或 [Predicate(references="1;2")]
-    m = re.search(r'Predicate\(references\s*=\s*"([^"]+)"', line, re.IGNORECASE)
-    if m:
-        references = m.group(1).strip()
+    references = m.group('pred_refs').strip()
+
+    if assembler:
+        assembler.current_predicate = references
+        # 显示分支标题
+        if assembler.current_decision_options:
+            add_predicate_header(doc, references, assembler.current_decision_options)
 
-        if assembler:
-            assembler.current_predicate = references
-            # 显示分支标题
-            if assembler.current_decision_options:
-                add_predicate_header(doc, references, assembler.current_decision_options)
+    return True
 
-        return True
 
-    # animtext with <p=1> and <p=2>
-    m = re.search(r'<p=1>([^<\n]+)<p=2>([^<\n]+)', line)
-    if m:
-        # treat as scene title + timestamp
-        title = m.group(1).strip()
-        time = m.group(2).strip()
-        add_scene_title(doc, title)
-        add_scene_timestamp(doc, time)
-        return True
+def _handle_scene(m, line: str, doc: Document, assembler) -> bool:
+    # animtext with <p=1> and <p=2>: treat as scene title + timestamp
+    add_scene_title(doc, m.group('scene_title').strip())
+    add_scene_timestamp(doc, m.group('scene_time').strip())
+    return True
+
 
+def _handle_subtitle(m, line: str, doc: Document, assembler) -> bool:
     # Subtitle(text="...") -> produce as centered short narration
-    m = re.search(r'Subtitle\(text\s*=\s*"([^"]+)"', line)
-    if m:
-        add_narration(doc, m.group(1))
-        return True
+    add_narration(doc, m.group('subtitle_text'))
+    return True
 
+
+def _handle_name_bracket(m, line: str, doc: Document, assembler) -> bool:
     # [name="角色"]对话
-    m = re.match(r'\[name="([^"]+)"\](.*)', line)
-    if m:
-        character = m.group(1).strip()
-        text = m.group(2).strip()
-        if not text:
-            text = ''
-        add_dialogue(doc, character, text)
-        return True
+    add_dialogue(doc, m.group('nb_name').strip(), m.group('nb_text').strip())
+    return True
+
 
+def _handle_name_loose(m, line: str, doc: Document, assembler) -> bool:
     # lines like name="阿米娅"]Mantra女士？怎么了？ (no bracket start)
-    m = re.search(r'name\s*=\s*"([^"]+)"\]\s*(.*)', line)
-    if m:
-        add_dialogue(doc, m.group(1).strip(), m.group(2).strip())
-        return True
-
-    # sound / music related directives
-    if line.startswith('[') and ('PlaySound' in line or 'PlayMusic' in line or 'StopSound' in line or 'stopmusic' in line or 'playsound' in line.lower() or 'StopMusic' in line):
-        # try extract key
-        m = re.search(r'key\s*=\s*"?([^",\)\]]+)"?', line)
-        if m:
-            key = m.group(1)
-            add_sound_effect(doc, key)
+    add_dialogue(doc, m.group('nl_name').strip(), m.group('nl_text').strip())
+    return True
+
+
+def _handle_sound(m, line: str, doc: Document, assembler) -> bool:
+    # sound / music related directives: try extract key
+    km = _SOUND_KEY_RE.search(line)
+    if km:
+        add_sound_effect(doc, km.group(1))
+    else:
+        # 没有 key= 的情况：若指令名在跳过列表中，视为已识别但不输出
+        cmd_m = _CMD_RE.match(line)
+        cmd = cmd_m.group(1) if cmd_m else ''
+        if cmd.lower() in _SKIP_DIRECTIVES:
+            # 识别但不写入
+            pass
         else:
-            # 没有 key= 的情况：若指令名在跳过列表中，视为已识别但不输出
-            cmd_m = re.match(r'\[?\s*([A-Za-z_][A-Za-z0-9_]*)', line)
-            cmd = cmd_m.group(1) if cmd_m else ''
-            cmd_lower = cmd.lower()
-            SKIP_DIRECTIVES_LOWER = {
-                'stopsound', 'stopmusic', 'soundvolume', 'blocker', 'delay',
-                'background', 'image', 'imagetween', 'curtain', 'camerashake', 'cameraeffect',
-                'focusout', 'bgeffect', 'charslot', 'dialog', 'subtitle', 'animtextclean',
-                'animtext', 'playsound', 'playmusic'
-            }
-            if cmd_lower in SKIP_DIRECTIVES_LOWER:
-                # 识别但不写入
-                pass
-            else:
-                # fallback: 原样尝试解析并写入
-                add_sound_effect(doc, line.strip('[]'))
-        return True
+            # fallback: 原样尝试解析并写入
+            add_sound_effect(doc, line.strip('[]'))
+    return True
 
+
+def _handle_quoted(m, line: str, doc: Document, assembler) -> bool:
     # Subtitle-like short quoted lines in plain text like: "留下。"
-    if re.match(r'^[""].+[""]$', line):
-        add_narration(doc, line)
-        return True
+    add_narration(doc, line)
+    return True
 
-    # scene separator markers
-    if line == '#' or line.lower().startswith('[dialog]') or line.lower().startswith('[charslot]') or line.lower().startswith('[background]'):
-        # 明确忽略这些结构化/控制指令（不写入 docx）
-        return False
 
+def _handle_control(m, line: str, doc: Document, assembler) -> bool:
+    # scene separator markers: 明确忽略这些结构化/控制指令（不写入 docx）
+    return False
+
+
+def _handle_angle(m, line: str, doc: Document, assembler) -> bool:
     # lines with angle-bracketed stage directions e.g. <雷声>
-    if line.startswith('<') and line.endswith('>'):
-        add_sound_effect(doc, line.strip('<>'))
-        return True
+    add_sound_effect(doc, line.strip('<>'))
+    return True
+
+
+# parse_line 的行分类规则，按优先级排列：(分组名, 行首字符, 模式, 处理函数)。
+# 所有规则拼成一个在行首 match 的交替正则，原本用 search 的规则加上 `.*?` 前缀，
+# 这样交替按顺序尝试时，第一个能在行内任意位置匹配的规则胜出，与逐条 search 的优先级一致。
+# 行首字符为 None 的规则可在行内任意位置匹配；否则只有行首字符属于该集合时才可能命中。
+_LINE_RULES = [
+    ('image', None, r'.*?Image\(image\s*=\s*"(?P<image_id>[^"]+)"', _handle_image),
+    ('decision', None,
+     r'.*?Decision\(options\s*=\s*"(?P<dec_options>[^"]+)".*?values\s*=\s*"(?P<dec_values>[^"]+)"',
+     _handle_decision),
+    ('predicate', None, r'.*?Predicate\(references\s*=\s*"(?P<pred_refs>[^"]+)"', _handle_predicate),
+    ('scene', None, r'.*?<p=1>(?P<scene_title>[^<\n]+)<p=2>(?P<scene_time>[^<\n]+)', _handle_scene),
+    ('subtitle', None, r'.*?Subtitle\(text\s*=\s*"(?P<subtitle_text>[^"]+)"', _handle_subtitle),
+    ('name_bracket', '[', r'\[name="(?P<nb_name>[^"]+)"\](?P<nb_text>.*)', _handle_name_bracket),
+    ('name_loose', None, r'.*?name\s*=\s*"(?P<nl_name>[^"]+)"\]\s*(?P<nl_text>.*)', _handle_name_loose),
+    ('sound', '[', r'\[.*?(?:PlaySound|PlayMusic|StopSound|stopmusic|StopMusic|(?i:playsound))', _handle_sound),
+    ('quoted', '"', r'[""].+[""]$', _handle_quoted),
+    ('control', '#[', r'#$|(?i:\[(?:dialog|charslot|background)\])', _handle_control),
+    ('angle', '<', r'<.*>$', _handle_angle),
+]
+
+_DISPATCH = {name: handler for name, _, _, handler in _LINE_RULES}
+
+
+def _compile_line_re(rules) -> re.Pattern:
+    """将规则拼接为一个带命名分组的交替正则"""
+    return re.compile('|'.join(f'(?P<{name}>{pattern})' for name, _, pattern, _ in rules))
+
+
+def _build_line_matchers(with_image: bool) -> tuple:
+    """按行首字符预先编译只含可能命中规则的交替正则。
+
+    返回 (行首字符 -> pattern.match 的字典, 其余字符使用的 pattern.match)，
+    parse_line 拿到的直接是绑定方法，不必再经过 pattern 对象取属性。
+    """
+    rules = [r for r in _LINE_RULES if with_image or r[0] != 'image']
+    prefixes = {c for _, first, _, _ in rules if first for c in first}
+    table = {c: _compile_line_re([r for r in rules if r[1] is None or c in r[1]]).match for c in prefixes}
+    return table, _compile_line_re([r for r in rules if r[1] is None]).match
+
+
+_LINE_MATCHERS = _build_line_matchers(with_image=True)
+# 图片规则需要 assembler 维护状态；没有 assembler 时该行交给后续规则处理
+_LINE_MATCHERS_NO_IMAGE = _build_line_matchers(with_image=False)
+
+
+def parse_line(line: str, doc: Document, assembler=None) -> bool:
+    """解析一行并将可识别内容写入 doc。
+
+    返回 True 表示该行被识别并处理，返回 False 表示该行未被识别（将被跳过）。
+    assembler: DocumentAssembler 实例，用于维护选择支和图片状态
+    """
+    line = line.strip()
+    if not line:
+        return False
+
+    # 先按行首字符分派，旁白/对话等普通行不再尝试只能以 [ < " # 开头的规则
+    table, default = _LINE_MATCHERS if assembler else _LINE_MATCHERS_NO_IMAGE
+    m = table.get(line[0], default)(line)
+    if m:
+        return _DISPATCH[m.lastgroup](m, line, doc, assembler)
 
     # 未识别的行：不写入 docx（按用户要求）
     return False
@@ -746,8 +905,8 @@ def parse_lines(lines, outpath, verbose: bool = False):
         skipped_path = outpath + '.skipped.txt'
         try:
             with open(skipped_path, 'w', encoding='utf-8') as sf:
-                for l in skipped:
-                    sf.write(l + '\n')
+                if skipped:
+                    sf.write('\n'.join(skipped) + '\n')
             print(f'注意: 有 {len(skipped)} 行被跳过，详情保存在: {skipped_path}')
         except Exception as e:
             print('写入 skipped file 失败:', e)
@@ -760,8 +919,36 @@ def parse_file(inpath: str, outpath: str, verbose: bool = False):
     This is an importable function; pass `verbose=True` to write a `.skipped.txt`.
     """
     with open(inpath, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    return parse_lines(lines, outpath, verbose=verbose)
+        return parse_lines(f, outpath, verbose=verbose)
+
+
+def parse_files(jobs, verbose: bool = False, max_workers: Optional[int] = None):
+    """批量解析多个脚本文件，每个文件各自生成一个 docx。
+
+    每个文件使用独立的 DocumentAssembler，文件之间没有共享状态，
+    因此用进程池并行处理（docx 生成是 CPU 密集型，线程受 GIL 限制）。
+
+    Args:
+        jobs: (输入路径, 输出路径) 序列
+        verbose: 同 parse_file，为每个文件写出 .skipped.txt
+        max_workers: 进程数，默认为 CPU 核数；为 1 时在当前进程中顺序处理
+
+    Returns:
+        与 jobs 顺序一致的跳过行列表
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    if workers <= 1:
+        return [parse_file(inpath, outpath, verbose=verbose) for inpath, outpath in jobs]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    inpaths = [inpath for inpath, _ in jobs]
+    outpaths = [outpath for _, outpath in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(parse_file, inpaths, outpaths, [verbose] * len(jobs)))
 
 
 def parse_text(text: str, outpath: str, verbose: bool = False):
@@ -769,8 +956,7 @@ def parse_text(text: str, outpath: str, verbose: bool = False):
 
     Returns the skipped lines list.
     """
-    lines = text.splitlines()
-    return parse_lines(lines, outpath, verbose=verbose)
+    return parse_lines(io.StringIO(text, newline=None), outpath, verbose=verbose)
 
 
 def main():
@@ -7,12 +7,34 @@ This module defines the core abstractions for the parser architecture:
 - StatefulParser: Base class for parsers that maintain state
 """
 
+import re
 from abc import ABC, abstractmethod
-from typing import Optional, Any, TYPE_CHECKING
+from typing import Optional, Any, Union, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from docx import Document
 
+# Flags that can be scoped to part of a pattern, and their inline letters
+_SCOPED_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'), (re.VERBOSE, 'x'))
+
+
+def search_dispatch_pattern(pattern: 're.Pattern') -> str:
+    """Build the dispatch_pattern of a parser whose can_parse is pattern.search.
+
+    The result matches at the start of a line and stops, without consuming
+    anything, where pattern.search would match, so the same regex is not
+    written out twice and ParserRegistry can run pattern.match from there.
+
+    Args:
+        pattern: The parser's compiled pattern (without inline global flags)
+
+    Returns:
+        Regex source for dispatch_pattern
+    """
+    flags = ''.join(letter for flag, letter in _SCOPED_FLAGS if pattern.flags & flag)
+    body = f'(?{flags}:{pattern.pattern})' if flags else pattern.pattern
+    return f'(?s:.*?)(?={body})'
+
 
 class ParserContext:
     """Shared context for all parsers.
@@ -20,14 +42,31 @@ class ParserContext:
     This context is passed to all parsers and provides access to:
     - The document being built
     - The DocumentAssembler instance
-    - Shared state dictionary for inter-parser communication
+    - Slot attributes for the state of the built-in parsers, which is
+      touched on every decision/predicate/image line
+    - Shared state dictionary for inter-parser communication (for other
+      parsers)
     """
 
+    __slots__ = (
+        'doc', 'assembler', 'state',
+        'decision_options', 'current_predicate',
+        'image_reference_runs', 'images_to_append',
+    )
+
     def __init__(self):
         self.doc: Optional['Document'] = None
         self.assembler: Optional[Any] = None  # DocumentAssembler instance
         self.state: dict = {}  # Shared state dictionary
 
+        # DecisionParser / PredicateParser: option value -> option text
+        self.decision_options: dict = {}
+        self.current_predicate: Optional[str] = None
+
+        # ImageParser: the run of image reference N is image_reference_runs[N - 1]
+        self.image_reference_runs: list = []
+        self.images_to_append: list = []
+
     def get_state(self, key: str, default=None):
         """Get a value from the shared state dictionary."""
         return self.state.get(key, default)
@@ -46,8 +85,34 @@ class LineParser(ABC):
     3. Optional initialization and finalization hooks
 
     Parsers are executed in priority order (lower number = higher priority).
+
+    The document helpers (add_dialogue etc.) live in parse_text_to_docx,
+    which imports this package, so parsers import them in __init__ and
+    keep them as attributes instead of importing at module level or on
+    every parse() call.
+
+    Attributes:
+        dispatch_pattern: Optional regex source that, matched at the start
+            of a stripped line, accepts exactly the lines can_parse accepts.
+            ParserRegistry fuses the dispatch patterns of neighbouring
+            parsers into one alternation so a line is classified with a
+            single regex match. If the parser has a compiled ``pattern``
+            whose match parse() reads, the dispatch pattern must end where
+            that pattern matches (see search_dispatch_pattern); the registry
+            then hands parse() ``pattern.match`` from there. Otherwise
+            parse() receives the dispatch match itself. Leave it as None if
+            can_parse cannot be expressed as a regex (e.g. it depends on
+            the context); such parsers are still consulted through
+            can_parse.
+        context_sensitive: Set to True if can_parse looks at the context
+            rather than only the line. ParserRegistry caches how repeated
+            lines are classified, and disables that cache while such a
+            parser is enabled.
     """
 
+    dispatch_pattern: Optional[str] = None
+    context_sensitive: bool = False
+
     def __init__(self, enabled: bool = True, priority: int = 50):
         """Initialize the parser.
 
@@ -59,25 +124,33 @@ class LineParser(ABC):
         self.priority = priority
 
     @abstractmethod
-    def can_parse(self, line: str, context: ParserContext) -> bool:
+    def can_parse(self, line: str, context: ParserContext) -> Union[bool, re.Match, None]:
         """Check if this parser can handle the given line.
 
+        Regex-based parsers return their match object (or None), which the
+        registry hands back to parse() so the line is not scanned twice.
+
         Args:
             line: The line to check
             context: Shared parser context
 
         Returns:
-            True if this parser can handle the line
+            A truthy value (typically a match object) if this parser can
+            handle the line
         """
         pass
 
     @abstractmethod
-    def parse(self, line: str, context: ParserContext) -> bool:
+    def parse(self, line: str, context: ParserContext, match: Optional[re.Match] = None) -> bool:
         """Parse the line and update the document.
 
         Args:
             line: The line to parse
             context: Shared parser context
+            match: The value can_parse returned for this line, or the match
+                built from dispatch_pattern when the registry dispatched the
+                line; None only when parse() is called directly, and parsers
+                then match the line themselves
 
         Returns:
             True if the line was successfully handled
@@ -94,6 +167,17 @@ class LineParser(ABC):
         """
         pass
 
+    def reset_section(self, context: ParserContext):
+        """Called before each section (parse_lines call) is parsed.
+
+        Override this method to clear per-section state. Unlike
+        initialize, this must stay cheap since it runs once per chapter.
+
+        Args:
+            context: Shared parser context
+        """
+        pass
+
     def finalize(self, context: ParserContext):
         """Called once after all parsing is complete.
 
@@ -5,6 +5,8 @@ This parser handles control directives that should be recognized but not
 written to the document output.
 """
 
+import re
+from typing import Optional
 from parsers.base import LineParser, ParserContext
 
 
@@ -21,6 +23,9 @@ class ControlParser(LineParser):
     but they are not written to the document.
     """
 
+    dispatch_pattern = r'#\Z|(?i:\[(?:dialog|charslot|background)\])'
+    _PAT = re.compile(dispatch_pattern)
+
     def __init__(self, enabled: bool = True, priority: int = 5):
         """Initialize the control parser.
 
@@ -30,7 +35,7 @@ class ControlParser(LineParser):
         """
         super().__init__(enabled, priority)
 
-    def can_parse(self, line: str, context: ParserContext) -> bool:
+    def can_parse(self, line: str, context: ParserContext) -> Optional[re.Match]:
         """Check if this is a control directive.
 
         Args:
@@ -38,22 +43,17 @@ class ControlParser(LineParser):
             context: Shared parser context
 
         Returns:
-            True if this is a control directive
+            The match object if this is a control directive
         """
-        line_lower = line.lower()
-        return (
-            line == '#' or
-            line_lower.startswith('[dialog]') or
-            line_lower.startswith('[charslot]') or
-            line_lower.startswith('[background]')
-        )
-
-    def parse(self, line: str, context: ParserContext) -> bool:
+        return self._PAT.match(line)
+
+    def parse(self, line: str, context: ParserContext, match: Optional[re.Match] = None) -> bool:
         """Parse the control directive (do nothing).
 
         Args:
             line: The line to parse
             context: Shared parser context
+            match: Unused
 
         Returns:
             False to indicate the line was recognized but not written
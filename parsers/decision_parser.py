@@ -6,7 +6,9 @@ and maintains the state of available choices.
 """
 
 import re
-from parsers.base import StatefulParser, ParserContext
+import sys
+from typing import Optional
+from parsers.base import StatefulParser, ParserContext, search_dispatch_pattern
 
 
 class DecisionParser(StatefulParser):
@@ -19,6 +21,12 @@ class DecisionParser(StatefulParser):
     PredicateParser.
     """
 
+    pattern = re.compile(
+        r'Decision\(options\s*=\s*"([^"]+)".*?values\s*=\s*"([^"]+)"',
+        re.IGNORECASE
+    )
+    dispatch_pattern = search_dispatch_pattern(pattern)
+
     def __init__(self, enabled: bool = True, priority: int = 20):
         """Initialize the decision parser.
 
@@ -27,10 +35,8 @@ class DecisionParser(StatefulParser):
             priority: Priority for parser execution (default: 20)
         """
         super().__init__(enabled, priority)
-        self.pattern = re.compile(
-            r'Decision\(options\s*=\s*"([^"]+)".*?values\s*=\s*"([^"]+)"',
-            re.IGNORECASE
-        )
+        from parse_text_to_docx import add_decision
+        self._add_decision = add_decision
 
     def initialize(self, context: ParserContext):
         """Initialize decision state.
@@ -38,12 +44,18 @@ class DecisionParser(StatefulParser):
         Args:
             context: Shared parser context
         """
-        self.set_parser_state(context, {
-            'current_decision_options': {},
-            'current_predicate': None
-        })
+        context.decision_options = {}
+        context.current_predicate = None
+
+    def reset_section(self, context: ParserContext):
+        """Forget the choices of the previous section.
 
-    def can_parse(self, line: str, context: ParserContext) -> bool:
+        Args:
+            context: Shared parser context
+        """
+        self.initialize(context)
+
+    def can_parse(self, line: str, context: ParserContext) -> Optional[re.Match]:
         """Check if this line contains a decision directive.
 
         Args:
@@ -51,40 +63,40 @@ class DecisionParser(StatefulParser):
             context: Shared parser context
 
         Returns:
-            True if this line contains a decision directive
+            The match object if this line contains a decision directive
         """
-        return self.pattern.search(line) is not None
+        if '(' not in line:
+            return None
+        return self.pattern.search(line)
 
-    def parse(self, line: str, context: ParserContext) -> bool:
+    def parse(self, line: str, context: ParserContext, match: Optional[re.Match] = None) -> bool:
         """Parse the decision directive.
 
         Args:
             line: The line to parse
             context: Shared parser context
+            match: Match object from can_parse, if already available
 
         Returns:
             True if the decision was successfully handled
         """
-        m = self.pattern.search(line)
+        m = match or self.pattern.search(line)
         if not m:
             return False
 
-        options_str = m.group(1)
-        values_str = m.group(2)
+        options_str, values_str = m.groups()
         options = options_str.split(';')
-        values = values_str.split(';')
 
-        # Update state
-        state = self.get_parser_state(context)
-        state['current_decision_options'] = {
-            v.strip(): o.strip() for v, o in zip(values, options)
-        }
-        state['current_predicate'] = None
-
-        # Import the add_decision function
-        from parse_text_to_docx import add_decision
+        # Update state; option values are short numeric strings looked up
+        # again for every predicate, so intern them
+        strip = str.strip
+        context.decision_options = dict(zip(
+            map(sys.intern, map(strip, values_str.split(';'))),
+            map(strip, options),
+        ))
+        context.current_predicate = None
 
         # Add decision to document (currently does nothing)
-        add_decision(context.doc, options)
+        self._add_decision(context.doc, options)
 
         return True
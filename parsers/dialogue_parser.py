@@ -7,7 +7,8 @@ This parser handles dialogue lines in various formats:
 """
 
 import re
-from parsers.base import LineParser, ParserContext
+from typing import Optional
+from parsers.base import LineParser, ParserContext, search_dispatch_pattern
 
 
 class DialogueParser(LineParser):
@@ -20,6 +21,11 @@ class DialogueParser(LineParser):
     Renders dialogue with character name in bold followed by the text.
     """
 
+    # Covers both formats: for [name="..."]text the leftmost match starts
+    # right after the bracket and yields the same name and (stripped) text
+    pattern = re.compile(r'name\s*=\s*"([^"]+)"\]\s*(.*)')
+    dispatch_pattern = search_dispatch_pattern(pattern)
+
     def __init__(self, enabled: bool = True, priority: int = 40):
         """Initialize the dialogue parser.
 
@@ -28,10 +34,10 @@ class DialogueParser(LineParser):
             priority: Priority for parser execution (default: 40)
         """
         super().__init__(enabled, priority)
-        self.pattern1 = re.compile(r'\[name="([^"]+)"\](.*)')
-        self.pattern2 = re.compile(r'name\s*=\s*"([^"]+)"\]\s*(.*)')
+        from parse_text_to_docx import add_dialogue
+        self._add_dialogue = add_dialogue
 
-    def can_parse(self, line: str, context: ParserContext) -> bool:
+    def can_parse(self, line: str, context: ParserContext) -> Optional[re.Match]:
         """Check if this line contains dialogue.
 
         Args:
@@ -39,38 +45,26 @@ class DialogueParser(LineParser):
             context: Shared parser context
 
         Returns:
-            True if this line contains dialogue
+            The match object if this line contains dialogue
         """
-        return (self.pattern1.match(line) is not None or
-                self.pattern2.search(line) is not None)
+        return self.pattern.search(line)
 
-    def parse(self, line: str, context: ParserContext) -> bool:
+    def parse(self, line: str, context: ParserContext, match: Optional[re.Match] = None) -> bool:
         """Parse the dialogue line.
 
         Args:
             line: The line to parse
             context: Shared parser context
+            match: Match object from can_parse, if already available
 
         Returns:
             True if the dialogue was successfully handled
         """
-        # Import the add_dialogue function
-        from parse_text_to_docx import add_dialogue
-
-        # Try pattern 1: [name="Character"]text
-        m = self.pattern1.match(line)
-        if m:
-            character = m.group(1).strip()
-            text = m.group(2).strip()
-            add_dialogue(context.doc, character, text)
-            return True
-
-        # Try pattern 2: name="Character"]text
-        m = self.pattern2.search(line)
-        if m:
-            character = m.group(1).strip()
-            text = m.group(2).strip()
-            add_dialogue(context.doc, character, text)
-            return True
-
-        return False
+        m = match or self.pattern.search(line)
+        if not m:
+            return False
+
+        character = m.group(1).strip()
+        text = m.group(2).strip()
+        self._add_dialogue(context.doc, character, text)
+        return True
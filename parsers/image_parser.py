@@ -6,7 +6,8 @@ image references and deferred image appending.
 """
 
 import re
-from parsers.base import StatefulParser, ParserContext
+from typing import Optional
+from parsers.base import StatefulParser, ParserContext, search_dispatch_pattern
 
 
 class ImageParser(StatefulParser):
@@ -19,6 +20,9 @@ class ImageParser(StatefulParser):
     of the document.
     """
 
+    pattern = re.compile(r'Image\(image\s*=\s*"([^"]+)"', re.IGNORECASE)
+    dispatch_pattern = search_dispatch_pattern(pattern)
+
     def __init__(self, enabled: bool = True, priority: int = 10):
         """Initialize the image parser.
 
@@ -27,7 +31,8 @@ class ImageParser(StatefulParser):
             priority: Priority for parser execution (default: 10, high priority)
         """
         super().__init__(enabled, priority)
-        self.pattern = re.compile(r'Image\(image\s*=\s*"([^"]+)"', re.IGNORECASE)
+        from parse_text_to_docx import add_image_reference
+        self._add_image_reference = add_image_reference
 
     def initialize(self, context: ParserContext):
         """Initialize image state.
@@ -35,13 +40,18 @@ class ImageParser(StatefulParser):
         Args:
             context: Shared parser context
         """
-        self.set_parser_state(context, {
-            'image_counter': 0,
-            'image_reference_runs': {},
-            'images_to_append': []
-        })
+        context.image_reference_runs = []
+        context.images_to_append = []
+
+    def reset_section(self, context: ParserContext):
+        """Start a new section with fresh image state.
 
-    def can_parse(self, line: str, context: ParserContext) -> bool:
+        Args:
+            context: Shared parser context
+        """
+        self.initialize(context)
+
+    def can_parse(self, line: str, context: ParserContext) -> Optional[re.Match]:
         """Check if this line contains an image directive.
 
         Args:
@@ -49,43 +59,42 @@ class ImageParser(StatefulParser):
             context: Shared parser context
 
         Returns:
-            True if this line contains an image directive
+            The match object if this line contains an image directive
         """
-        return self.pattern.search(line) is not None
+        if '(' not in line:
+            return None
+        return self.pattern.search(line)
 
-    def parse(self, line: str, context: ParserContext) -> bool:
+    def parse(self, line: str, context: ParserContext, match: Optional[re.Match] = None) -> bool:
         """Parse the image directive.
 
         Args:
             line: The line to parse
             context: Shared parser context
+            match: Match object from can_parse, if already available
 
         Returns:
             True if the image was successfully handled
         """
-        m = self.pattern.search(line)
+        m = match or self.pattern.search(line)
         if not m:
             return False
 
         image_id = m.group(1).strip()
-        state = self.get_parser_state(context)
 
         # Get image_map from assembler
         image_map = context.assembler.image_map if context.assembler else {}
 
         if image_id in image_map:
-            state['image_counter'] += 1
+            runs = context.image_reference_runs
+            counter = len(runs) + 1
             image_url = image_map[image_id]
 
-            # Import the add_image_reference function
-            from parse_text_to_docx import add_image_reference
-
             # Add image reference to document
-            run = add_image_reference(context.doc, state['image_counter'])
-            state['image_reference_runs'][state['image_counter']] = run
+            runs.append(self._add_image_reference(context.doc, counter))
 
             # Queue image for appending
-            state['images_to_append'].append((state['image_counter'], image_url))
+            context.images_to_append.append((counter, image_url))
 
         return True
 
@@ -95,11 +104,10 @@ class ImageParser(StatefulParser):
         Args:
             context: Shared parser context
         """
-        state = self.get_parser_state(context)
-        if state and state.get('images_to_append') and context.assembler:
+        if context.images_to_append and context.assembler:
             # Delegate to assembler's append_images method
             # We'll need to update the assembler's state for compatibility
-            context.assembler.image_counter = state['image_counter']
-            context.assembler.image_reference_runs = state['image_reference_runs']
-            context.assembler.images_to_append = state['images_to_append']
+            context.assembler.image_counter = len(context.image_reference_runs)
+            context.assembler.image_reference_runs = context.image_reference_runs
+            context.assembler.images_to_append = context.images_to_append
             context.assembler.append_images()
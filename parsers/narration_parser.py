@@ -7,9 +7,20 @@ This parser handles quoted narration lines like:
 """
 
 import re
+from typing import Optional
 from parsers.base import LineParser, ParserContext
 
 
+def _is_quoted(line: str) -> bool:
+    """Same test as the dispatch pattern, without the regex engine.
+
+    A double quote at each end with at least one character in between;
+    like ``.`` in the pattern, the inner text may not contain a newline.
+    """
+    return (len(line) > 2 and line[0] == '"' and line[-1] == '"'
+            and '\n' not in line)
+
+
 class NarrationParser(LineParser):
     """Parser for quoted narration text.
 
@@ -20,6 +31,8 @@ class NarrationParser(LineParser):
     Renders narration with special formatting (Kai font, indented).
     """
 
+    dispatch_pattern = r'[""].+[""]$'
+
     def __init__(self, enabled: bool = True, priority: int = 60):
         """Initialize the narration parser.
 
@@ -28,7 +41,8 @@ class NarrationParser(LineParser):
             priority: Priority for parser execution (default: 60, low priority)
         """
         super().__init__(enabled, priority)
-        self.pattern = re.compile(r'^[""].+[""]$')
+        from parse_text_to_docx import add_narration
+        self._add_narration = add_narration
 
     def can_parse(self, line: str, context: ParserContext) -> bool:
         """Check if this line is quoted narration.
@@ -40,25 +54,23 @@ class NarrationParser(LineParser):
         Returns:
             True if this line is quoted narration
         """
-        return self.pattern.match(line) is not None
+        return _is_quoted(line)
 
-    def parse(self, line: str, context: ParserContext) -> bool:
+    def parse(self, line: str, context: ParserContext, match: Optional[re.Match] = None) -> bool:
         """Parse the narration line.
 
         Args:
             line: The line to parse
             context: Shared parser context
+            match: Value returned by can_parse, if already available
 
         Returns:
             True if the narration was successfully handled
         """
-        if not self.pattern.match(line):
+        if not (match or _is_quoted(line)):
             return False
 
-        # Import the add_narration function
-        from parse_text_to_docx import add_narration
-
         # Add narration
-        add_narration(context.doc, line)
+        self._add_narration(context.doc, line)
 
         return True
@@ -6,7 +6,8 @@ branch headers based on the current decision state.
 """
 
 import re
-from parsers.base import StatefulParser, ParserContext
+from typing import Optional
+from parsers.base import StatefulParser, ParserContext, search_dispatch_pattern
 
 
 class PredicateParser(StatefulParser):
@@ -19,6 +20,9 @@ class PredicateParser(StatefulParser):
     Uses the decision state from DecisionParser to display branch headers.
     """
 
+    pattern = re.compile(r'Predicate\(references\s*=\s*"([^"]+)"', re.IGNORECASE)
+    dispatch_pattern = search_dispatch_pattern(pattern)
+
     def __init__(self, enabled: bool = True, priority: int = 21):
         """Initialize the predicate parser.
 
@@ -27,10 +31,10 @@ class PredicateParser(StatefulParser):
             priority: Priority for parser execution (default: 21, just after DecisionParser)
         """
         super().__init__(enabled, priority)
-        self.pattern = re.compile(r'Predicate\(references\s*=\s*"([^"]+)"', re.IGNORECASE)
-        self.decision_parser_key = "DecisionParser_state"
+        from parse_text_to_docx import add_predicate_header
+        self._add_predicate_header = add_predicate_header
 
-    def can_parse(self, line: str, context: ParserContext) -> bool:
+    def can_parse(self, line: str, context: ParserContext) -> Optional[re.Match]:
         """Check if this line contains a predicate directive.
 
         Args:
@@ -38,38 +42,35 @@ class PredicateParser(StatefulParser):
             context: Shared parser context
 
         Returns:
-            True if this line contains a predicate directive
+            The match object if this line contains a predicate directive
         """
-        return self.pattern.search(line) is not None
+        if '(' not in line:
+            return None
+        return self.pattern.search(line)
 
-    def parse(self, line: str, context: ParserContext) -> bool:
+    def parse(self, line: str, context: ParserContext, match: Optional[re.Match] = None) -> bool:
         """Parse the predicate directive.
 
         Args:
             line: The line to parse
             context: Shared parser context
+            match: Match object from can_parse, if already available
 
         Returns:
             True if the predicate was successfully handled
         """
-        m = self.pattern.search(line)
+        m = match or self.pattern.search(line)
         if not m:
             return False
 
         references = m.group(1).strip()
 
-        # Get decision state
-        decision_state = context.get_state(self.decision_parser_key, {})
-        current_options = decision_state.get('current_decision_options', {})
-
         # Add predicate header if we have decision options
+        current_options = context.decision_options
         if current_options:
-            # Import the add_predicate_header function
-            from parse_text_to_docx import add_predicate_header
-            add_predicate_header(context.doc, references, current_options)
+            self._add_predicate_header(context.doc, references, current_options)
 
         # Update decision state with current predicate
-        decision_state['current_predicate'] = references
-        context.set_state(self.decision_parser_key, decision_state)
+        context.current_predicate = references
 
         return True
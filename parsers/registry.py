@@ -5,9 +5,31 @@ The ParserRegistry maintains a collection of parsers and provides
 methods for registering, enabling/disabling, and executing them.
 """
 
-from typing import List, Optional, Type
+import bisect
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
 from parsers.base import LineParser, ParserContext
 
+# One dispatch step: (fused_match, {group name: (parser, match_at)}) for a run
+# of parsers with dispatch patterns, or (None, parser) for a parser that needs
+# can_parse. match_at is parser.pattern.match, or None if parse() takes the
+# dispatch match itself.
+_DispatchStep = Tuple[
+    Optional[Callable],
+    Union[Dict[str, Tuple[LineParser, Optional[Callable]]], LineParser],
+]
+
+# Maps a stripped, non-blank line to (parser, match), or (None, None) if no
+# parser accepts it
+_Classifier = Callable[[str], Tuple[Optional[LineParser], object]]
+
+
+def _pattern_match(parser: LineParser) -> Optional[Callable]:
+    """Return the match method of parser.pattern, if the parser has one."""
+    pattern = getattr(parser, 'pattern', None)
+    return pattern.match if isinstance(pattern, re.Pattern) else None
+
 
 class ParserRegistry:
     """Registry for managing all parsers.
@@ -18,12 +40,35 @@ class ParserRegistry:
     - Enabling and disabling parsers
     - Initializing and finalizing all parsers
     - Parsing lines with the registered parsers
+
+    Enabled parsers that define a dispatch_pattern are fused, in priority
+    order, into a single alternation regex, so classifying a line costs one
+    regex match instead of one can_parse call per parser; the chosen
+    parser's own pattern is then matched once, at the position the fused
+    match located, and handed to parse(). The list of enabled parsers and
+    the fused plan are cached and rebuilt after register/unregister/
+    enable_parser/disable_parser; call invalidate() after toggling
+    ``parser.enabled`` directly.
+
+    Scripts repeat many lines verbatim (stage directions, sound cues), so
+    the parser chosen for a line is kept in an LRU cache of
+    ``classify_cache_size`` entries, dropped whenever the plan is rebuilt.
+    Only the classification is cached; parse() still runs for every line.
+    The cache is bypassed while a parser marked ``context_sensitive`` is
+    enabled.
     """
 
+    classify_cache_size = 4096
+
     def __init__(self):
         """Initialize the parser registry."""
         self.parsers: List[LineParser] = []
+        # Priorities of self.parsers, kept in step with it for bisect
+        self._priorities: List[int] = []
         self.context = ParserContext()
+        self._active_parsers: Optional[List[LineParser]] = None
+        self._plan: Optional[List[_DispatchStep]] = None
+        self._classify: Optional[_Classifier] = None
 
     def register(self, parser: LineParser):
         """Register a parser.
@@ -33,9 +78,12 @@ class ParserRegistry:
         Args:
             parser: The parser to register
         """
-        self.parsers.append(parser)
-        # Sort by priority (lower number = higher priority)
-        self.parsers.sort(key=lambda p: p.priority)
+        # Insert after any parsers of equal priority (lower number = higher priority);
+        # bisect.insort only takes key= from Python 3.10, so keep a priority list
+        i = bisect.bisect_right(self._priorities, parser.priority)
+        self._priorities.insert(i, parser.priority)
+        self.parsers.insert(i, parser)
+        self.invalidate()
 
     def unregister(self, parser_class: Type[LineParser]):
         """Unregister all parsers of a given class.
@@ -44,6 +92,8 @@ class ParserRegistry:
             parser_class: The parser class to unregister
         """
         self.parsers = [p for p in self.parsers if not isinstance(p, parser_class)]
+        self._priorities = [p.priority for p in self.parsers]
+        self.invalidate()
 
     def get_parser(self, parser_class: Type[LineParser]) -> Optional[LineParser]:
         """Get a parser instance by class.
@@ -68,6 +118,7 @@ class ParserRegistry:
         parser = self.get_parser(parser_class)
         if parser:
             parser.enabled = True
+            self.invalidate()
 
     def disable_parser(self, parser_class: Type[LineParser]):
         """Disable a specific parser.
@@ -78,24 +129,120 @@ class ParserRegistry:
         parser = self.get_parser(parser_class)
         if parser:
             parser.enabled = False
+            self.invalidate()
+
+    def invalidate(self):
+        """Drop the cached active-parser list, fused dispatch plan and classifier.
+
+        All are rebuilt on next use.
+        """
+        self._active_parsers = None
+        self._plan = None
+        self._classify = None
+
+    def _rebuild_active(self) -> List[LineParser]:
+        """Cache the enabled parsers, in priority order."""
+        self._active_parsers = [p for p in self.parsers if p.enabled]
+        return self._active_parsers
+
+    def _active(self) -> List[LineParser]:
+        """Return the enabled parsers, in priority order."""
+        active = self._active_parsers
+        return active if active is not None else self._rebuild_active()
+
+    def _build_plan(self) -> List[_DispatchStep]:
+        """Group the enabled parsers into dispatch steps, keeping priority order.
+
+        Consecutive parsers with a dispatch_pattern become one fused regex;
+        regex alternation tries branches left to right, so the first
+        matching branch is the highest-priority parser that accepts the line.
+        """
+        plan: List[_DispatchStep] = []
+        run: List[LineParser] = []
+
+        def flush():
+            if run:
+                groups = {f'p{i}': parser for i, parser in enumerate(run)}
+                fused = re.compile('|'.join(
+                    f'(?P<{name}>{parser.dispatch_pattern})'
+                    for name, parser in groups.items()
+                ))
+                plan.append((fused.match, {
+                    name: (parser, _pattern_match(parser))
+                    for name, parser in groups.items()
+                }))
+                run.clear()
+
+        for parser in self._active():
+            if parser.dispatch_pattern is None:
+                flush()
+                plan.append((None, parser))
+            else:
+                run.append(parser)
+        flush()
+
+        self._plan = plan
+        return plan
+
+    def _build_classifier(self) -> _Classifier:
+        """Build the line classifier for the current plan and cache it."""
+        plan = self._plan if self._plan is not None else self._build_plan()
+        context = self.context
+
+        def classify(line: str) -> Tuple[Optional[LineParser], object]:
+            for fused_match, target in plan:
+                if fused_match is None:
+                    m = target.can_parse(line, context)
+                    if m:
+                        return target, m
+                else:
+                    fm = fused_match(line)
+                    if fm:
+                        name = fm.lastgroup
+                        parser, match_at = target[name]
+                        if match_at is None:
+                            return parser, fm
+                        # The dispatch pattern ends where the parser's own
+                        # pattern matches, so match there instead of searching
+                        m = match_at(line, fm.end(name))
+                        if m is None:
+                            raise ValueError(
+                                f'{type(parser).__name__}.dispatch_pattern does not '
+                                f'end where its pattern matches: {line!r}'
+                            )
+                        return parser, m
+            return None, None
+
+        if not any(fused_match is None and target.context_sensitive
+                   for fused_match, target in plan):
+            classify = lru_cache(maxsize=self.classify_cache_size)(classify)
+        self._classify = classify
+        return classify
 
     def initialize_all(self):
         """Initialize all enabled parsers.
 
         This should be called once before parsing begins.
         """
-        for parser in self.parsers:
-            if parser.enabled:
-                parser.initialize(self.context)
+        for parser in self._active():
+            parser.initialize(self.context)
+
+    def reset_section(self):
+        """Reset per-section state of all enabled parsers.
+
+        This should be called before each section; initialize_all is
+        not repeated.
+        """
+        for parser in self._active():
+            parser.reset_section(self.context)
 
     def finalize_all(self):
         """Finalize all enabled parsers.
 
         This should be called once after all parsing is complete.
         """
-        for parser in self.parsers:
-            if parser.enabled:
-                parser.finalize(self.context)
+        for parser in self._active():
+            parser.finalize(self.context)
 
     def parse_line(self, line: str) -> bool:
         """Try to parse a line with registered parsers.
@@ -108,15 +255,34 @@ class ParserRegistry:
         Returns:
             True if a parser handled the line, False otherwise
         """
-        line = line.strip()
-        if not line:
-            return False
+        return not self.parse_lines((line,))
 
-        for parser in self.parsers:
-            if not parser.enabled:
-                continue
+    def parse_lines(self, lines: Iterable[str], stripped: bool = False) -> List[str]:
+        """Parse a sequence of lines in one call.
+
+        Equivalent to calling parse_line on each line, but the dispatch plan
+        and the per-line lookups are resolved once for the whole batch
+        instead of once per line. The plan is fixed for the duration of the
+        call.
+
+        Args:
+            lines: The lines to parse (trailing newlines are allowed)
+            stripped: True if the caller guarantees the lines carry no
+                surrounding whitespace, so they are not stripped again
+
+        Returns:
+            The lines, as given, that no parser handled (including blank lines)
+        """
+        context = self.context
+        classify = self._classify if self._classify is not None else self._build_classifier()
+        unhandled: List[str] = []
+        skip = unhandled.append
+
+        for raw in lines:
+            line = raw if stripped else raw.strip()
+            parser, m = classify(line) if line else (None, None)
 
-            if parser.can_parse(line, self.context):
-                return parser.parse(line, self.context)
+            if parser is None or not parser.parse(line, context, m):
+                skip(raw)
 
-        return False
+        return unhandled
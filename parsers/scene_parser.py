@@ -6,7 +6,8 @@ This parser handles scene titles with timestamps in the format:
 """
 
 import re
-from parsers.base import LineParser, ParserContext
+from typing import Optional
+from parsers.base import LineParser, ParserContext, search_dispatch_pattern
 
 
 class SceneParser(LineParser):
@@ -18,6 +19,9 @@ class SceneParser(LineParser):
     Adds both the scene title and timestamp to the document.
     """
 
+    pattern = re.compile(r'<p=1>([^<\n]+)<p=2>([^<\n]+)')
+    dispatch_pattern = search_dispatch_pattern(pattern)
+
     def __init__(self, enabled: bool = True, priority: int = 30):
         """Initialize the scene parser.
 
@@ -26,9 +30,11 @@ class SceneParser(LineParser):
             priority: Priority for parser execution (default: 30)
         """
         super().__init__(enabled, priority)
-        self.pattern = re.compile(r'<p=1>([^<\n]+)<p=2>([^<\n]+)')
+        from parse_text_to_docx import add_scene_title, add_scene_timestamp
+        self._add_scene_title = add_scene_title
+        self._add_scene_timestamp = add_scene_timestamp
 
-    def can_parse(self, line: str, context: ParserContext) -> bool:
+    def can_parse(self, line: str, context: ParserContext) -> Optional[re.Match]:
         """Check if this line contains a scene title directive.
 
         Args:
@@ -36,32 +42,32 @@ class SceneParser(LineParser):
             context: Shared parser context
 
         Returns:
-            True if this line contains a scene title directive
+            The match object if this line contains a scene title directive
         """
-        return self.pattern.search(line) is not None
+        if '<p=1>' not in line:
+            return None
+        return self.pattern.search(line)
 
-    def parse(self, line: str, context: ParserContext) -> bool:
+    def parse(self, line: str, context: ParserContext, match: Optional[re.Match] = None) -> bool:
         """Parse the scene title directive.
 
         Args:
             line: The line to parse
             context: Shared parser context
+            match: Match object from can_parse, if already available
 
         Returns:
             True if the scene title was successfully handled
         """
-        m = self.pattern.search(line)
+        m = match or self.pattern.search(line)
         if not m:
             return False
 
         title = m.group(1).strip()
         time = m.group(2).strip()
 
-        # Import the functions
-        from parse_text_to_docx import add_scene_title, add_scene_timestamp
-
         # Add scene title and timestamp
-        add_scene_title(context.doc, title)
-        add_scene_timestamp(context.doc, time)
+        self._add_scene_title(context.doc, title)
+        self._add_scene_timestamp(context.doc, time)
 
         return True
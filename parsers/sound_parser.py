@@ -8,8 +8,13 @@ This parser handles sound/music directives and stage directions:
 """
 
 import re
+from typing import Optional
 from parsers.base import LineParser, ParserContext
 
+# Sound/music command names (case-sensitive, as listed)
+_SOUND_COMMANDS = r'PlaySound|PlayMusic|StopSound|stopmusic|StopMusic|playsound|playmusic'
+_KEY_RE = re.compile(r'key\s*=\s*"?([^",\)\]]+)"?')
+
 
 class SoundParser(LineParser):
     """Parser for sound/music directives and stage directions.
@@ -22,6 +27,10 @@ class SoundParser(LineParser):
     Can be configured to skip resource IDs (like $bgm_xxx).
     """
 
+    # A [...] line mentioning a sound command, or a whole-line <stage direction>
+    dispatch_pattern = r'\[(?s:.*?)(?:' + _SOUND_COMMANDS + r')|<(?s:.*)>\Z'
+    _PAT = re.compile(dispatch_pattern)
+
     def __init__(self, enabled: bool = True, priority: int = 45,
                  skip_resource_ids: bool = True):
         """Initialize the sound parser.
@@ -32,15 +41,39 @@ class SoundParser(LineParser):
             skip_resource_ids: Whether to skip resource IDs (default: True)
         """
         super().__init__(enabled, priority)
+        from parse_text_to_docx import add_sound_effect
+        self._add_sound_effect = add_sound_effect
         self.skip_resource_ids = skip_resource_ids
-        self.skip_directives = {
+        self.skip_directives = frozenset({
             'stopsound', 'stopmusic', 'soundvolume', 'blocker', 'delay',
             'background', 'image', 'imagetween', 'curtain', 'camerashake',
             'cameraeffect', 'focusout', 'bgeffect', 'charslot', 'dialog',
             'subtitle', 'animtextclean', 'animtext', 'playsound', 'playmusic'
-        }
+        })
+        self._skip_re = self._compile_skip_re(self.skip_directives)
+
+    @staticmethod
+    def _compile_skip_re(names) -> re.Pattern:
+        """Build a matcher for lines whose command name is one of ``names``.
+
+        Equivalent to extracting the leading identifier of ``[Command ...``
+        and testing ``cmd.lower() in names``, but the prefix classification
+        happens inside one compiled regex instead of a match, a slice, a
+        lower() and a set lookup. Longer names come first so e.g.
+        ``animtextclean`` is not cut short by ``animtext``; the lookahead
+        then requires the whole identifier to match.
+
+        Args:
+            names: Lower-case command names
+
+        Returns:
+            Compiled pattern to use with ``.match(line)``
+        """
+        alternatives = '|'.join(sorted(map(re.escape, names), key=len, reverse=True))
+        # (?ai:) keeps case folding ASCII-only, like lower() on an ASCII identifier
+        return re.compile(r'\[?\s*(?ai:' + alternatives + r')(?![A-Za-z0-9_])')
 
-    def can_parse(self, line: str, context: ParserContext) -> bool:
+    def can_parse(self, line: str, context: ParserContext) -> Optional[re.Match]:
         """Check if this line contains a sound/music directive.
 
         Args:
@@ -48,56 +81,41 @@ class SoundParser(LineParser):
             context: Shared parser context
 
         Returns:
-            True if this line contains a sound/music directive
+            The match object if this line contains a sound/music directive
         """
-        # Check for sound/music directives
-        if line.startswith('[') and any(cmd in line for cmd in
-            ['PlaySound', 'PlayMusic', 'StopSound', 'stopmusic', 'StopMusic',
-             'playsound', 'playmusic']):
-            return True
-
-        # Check for stage directions <...>
-        if line.startswith('<') and line.endswith('>'):
-            return True
+        return self._PAT.match(line)
 
-        return False
-
-    def parse(self, line: str, context: ParserContext) -> bool:
+    def parse(self, line: str, context: ParserContext, match: Optional[re.Match] = None) -> bool:
         """Parse the sound/music directive.
 
         Args:
             line: The line to parse
             context: Shared parser context
+            match: Unused; the line is classified again below
 
         Returns:
             True if the directive was successfully handled
         """
-        # Import the add_sound_effect function
-        from parse_text_to_docx import add_sound_effect
-
         # Handle <stage direction>
         if line.startswith('<') and line.endswith('>'):
             text = line.strip('<>')
-            add_sound_effect(context.doc, text)
+            self._add_sound_effect(context.doc, text)
             return True
 
         # Handle [PlaySound/PlayMusic/etc]
         if line.startswith('['):
             # Try to extract key
-            m = re.search(r'key\s*=\s*"?([^",\)\]]+)"?', line)
+            m = _KEY_RE.search(line)
             if m:
                 key = m.group(1)
-                add_sound_effect(context.doc, key)
+                self._add_sound_effect(context.doc, key)
             else:
                 # Check if it's a known skip directive
-                cmd_m = re.match(r'\[?\s*([A-Za-z_][A-Za-z0-9_]*)', line)
-                if cmd_m:
-                    cmd = cmd_m.group(1).lower()
-                    if cmd in self.skip_directives:
-                        # Recognized but not written
-                        return True
+                if self._skip_re.match(line):
+                    # Recognized but not written
+                    return True
                 # Fallback: try to parse
-                add_sound_effect(context.doc, line.strip('[]'))
+                self._add_sound_effect(context.doc, line.strip('[]'))
 
             return True
 
@@ -6,7 +6,8 @@ as narration text.
 """
 
 import re
-from parsers.base import LineParser, ParserContext
+from typing import Optional
+from parsers.base import LineParser, ParserContext, search_dispatch_pattern
 
 
 class SubtitleParser(LineParser):
@@ -18,6 +19,9 @@ class SubtitleParser(LineParser):
     Renders subtitles as narration text.
     """
 
+    pattern = re.compile(r'Subtitle\(text\s*=\s*"([^"]+)"')
+    dispatch_pattern = search_dispatch_pattern(pattern)
+
     def __init__(self, enabled: bool = True, priority: int = 35):
         """Initialize the subtitle parser.
 
@@ -26,9 +30,10 @@ class SubtitleParser(LineParser):
             priority: Priority for parser execution (default: 35)
         """
         super().__init__(enabled, priority)
-        self.pattern = re.compile(r'Subtitle\(text\s*=\s*"([^"]+)"')
+        from parse_text_to_docx import add_narration
+        self._add_narration = add_narration
 
-    def can_parse(self, line: str, context: ParserContext) -> bool:
+    def can_parse(self, line: str, context: ParserContext) -> Optional[re.Match]:
         """Check if this line contains a subtitle directive.
 
         Args:
@@ -36,30 +41,30 @@ class SubtitleParser(LineParser):
             context: Shared parser context
 
         Returns:
-            True if this line contains a subtitle directive
+            The match object if this line contains a subtitle directive
         """
-        return self.pattern.search(line) is not None
+        if 'Subtitle(' not in line:
+            return None
+        return self.pattern.search(line)
 
-    def parse(self, line: str, context: ParserContext) -> bool:
+    def parse(self, line: str, context: ParserContext, match: Optional[re.Match] = None) -> bool:
         """Parse the subtitle directive.
 
         Args:
             line: The line to parse
             context: Shared parser context
+            match: Match object from can_parse, if already available
 
         Returns:
             True if the subtitle was successfully handled
         """
-        m = self.pattern.search(line)
+        m = match or self.pattern.search(line)
         if not m:
             return False
 
         text = m.group(1)
 
-        # Import the add_narration function
-        from parse_text_to_docx import add_narration
-
         # Add subtitle as narration
-        add_narration(context.doc, text)
+        self._add_narration(context.doc, text)
 
         return True
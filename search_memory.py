@@ -1,16 +1,56 @@
 from __future__ import annotations
 
-import json
 import os
+import threading
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlencode, quote
 from bs4 import BeautifulSoup
-from common import Requester, Story
+from requests.utils import add_dict_to_cookiejar
+from common import CacheStore, Requester, Story, find_pre_text, load_json_cache
+
+try:
+    # 可选依赖：lexbor 是 C 实现的 HTML 解析器，未安装时退回 BeautifulSoup
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+
+def _find_datas_txt(html: str) -> str | None:
+    """返回页面中 <pre id="datas_txt"> 的文本，不存在时返回 None"""
+    content = find_pre_text(html, "datas_txt")
+    if content is not None:
+        return content
+    if LexborHTMLParser is not None:
+        node = LexborHTMLParser(html).css_first("pre#datas_txt")
+        return node.text() if node is not None else None
+    node = BeautifulSoup(html, 'html.parser').find("pre", id="datas_txt")
+    return node.get_text() if node is not None else None
+
+
+# 并发下载秘录页面的默认线程数，避免对 prts.wiki 造成过大压力；
+# 各线程共用 Requester，请求发起间隔仍受其 delay 限制
+MEMORY_FETCH_WORKERS = 6
+
+
+# char_memory 表的一行密录，字段与 get_all_memory 查询的 fields 一一对应
+MemoryEntry = namedtuple(
+    "MemoryEntry",
+    "page elite level favor storySetName storyIntro storyTxt storyIndex medal",
+)
+
+
+def _to_entry(row) -> MemoryEntry:
+    """把 cargoquery 返回的 {"title": {...}} 行展平为 MemoryEntry"""
+    return MemoryEntry(*map(row["title"].get, MemoryEntry._fields))
+
 
 class PRTSClient:
     HOME = "https://prts.wiki/"
     API = "https://prts.wiki/api.php"
 
-    CACHE_FILE = "prts_cache.json"
+    CACHE_FILE = "prts_cache.json"    # 旧版 JSON 缓存，仅在首次使用 DB_FILE 时导入
+    DB_FILE = "prts_cache.sqlite"
 
     BASE_HEADERS = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
@@ -18,61 +58,96 @@ class PRTSClient:
         "Accept": "text/html,application/xhtml+xml",
     }
 
-    def __init__(self, use_cache=True, requester=None):
+    def __init__(self, use_cache=True, requester=None, full_refresh=False):
+        """use_cache 为 False 时只增量更新密录列表，Cookie 与密录正文重新获取；
+        full_refresh 为 True 时清空全部缓存并全量重新下载"""
         self.requester = requester or Requester()
         self.session = self.requester.session
         self.initialized = False
         self.use_cache = use_cache
 
         self.memory_cache = None     # 全量密录缓存
+        self._memory_index = None    # {干员名: [MemoryEntry]}，由 memory_cache 按需构建
         self.cookie_cache = None     # Cookie 缓存
+        self._memory_stale = False   # 缓存的密录列表是否需要先增量更新
+
+        self.db = CacheStore(self.DB_FILE)
+        self._kv = self.db.table("kv")                # Cookie 等零散数据
+        self._memory_table = self.db.table("memory")  # {干员名: [cargoquery 原始行]}
+        self.body_cache = self.db.table("body")       # 密录页面正文缓存 {storyTxt: 脚本文本}
 
-        if use_cache:
+        if full_refresh:
+            self.db.clear()
+        elif use_cache:
             self._load_cache()
+        else:
+            # 已缓存的密录列表保留，get_all_memory 只下载其后新增的行；其余缓存清空
+            self._kv.pop("cookies", None)
+            self.body_cache.clear()
+            self._memory_stale = bool(self._memory_table)
 
     # ------------------------------------------------------
     # 缓存系统
     # ------------------------------------------------------
     def _load_cache(self):
-        """加载本地缓存"""
-        if not os.path.exists(self.CACHE_FILE):
-            return
-
+        """加载本地缓存（密录与正文按需查询，不整体读入内存）"""
         try:
-            with open(self.CACHE_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            if not self._kv and os.path.exists(self.CACHE_FILE):
+                self._import_json_cache()
 
             # Cookie
-            if "cookies" in data:
-                for k, v in data["cookies"].items():
-                    self.session.cookies.set(k, v)
+            cookies = self._kv.get("cookies")
+            if cookies:
+                add_dict_to_cookiejar(self.session.cookies, cookies)
                 print("✔ 已加载缓存 Cookie")
                 self.initialized = True
 
             # 密录数据
-            if "char_memory" in data:
-                self.memory_cache = data["char_memory"]
-                print(f"✔ 已加载缓存密录记录：{len(self.memory_cache)} 条")
+            operators = len(self._memory_table)
+            if operators:
+                print(f"✔ 已加载缓存密录：{operators} 位干员")
 
         except Exception as e:
             print("⚠ 无法读取缓存:", e)
 
-    def _save_cache(self):
-        """保存缓存文件"""
-        data = {}
-
-        # 保存 Cookie
-        data["cookies"] = {k: v for k, v in self.session.cookies.items()}
-
-        # 保存密录
-        if self.memory_cache is not None:
-            data["char_memory"] = self.memory_cache
-
-        with open(self.CACHE_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+    def _import_json_cache(self):
+        """把旧版 prts_cache.json 导入 sqlite 缓存"""
+        data = load_json_cache(self.CACHE_FILE)
+        if "cookies" in data:
+            self._kv["cookies"] = data["cookies"]
+        if "char_memory" in data:
+            self._store_memory(data["char_memory"])
+        if "char_memory_bodies" in data:
+            self.body_cache.update_many(data["char_memory_bodies"])
+        self._kv["json_imported"] = True
+        print(f"✔ 已从 {self.CACHE_FILE} 导入缓存")
 
+    def _save_cache(self):
+        """保存 Cookie（密录与正文在获取时已逐行写入）"""
+        self._kv["cookies"] = self.session.cookies.get_dict()
         print("💾 缓存已保存。")
 
+    def _store_memory(self, rows, merge=False):
+        """按干员名分组后在同一事务中写入密录
+
+        merge 为 True 时只替换 rows 中出现的干员的记录（Cargo 在页面重新保存时会以新行号
+        重新插入该页面的全部行，因此增量结果即为这些干员的完整记录），其余干员保持不变
+        """
+        grouped = defaultdict(list)
+        for r in rows:
+            grouped[r["title"]["page"]].append(r)
+        if not merge:
+            self._memory_table.clear()
+            self._kv.pop("memory_max_id", None)
+        self._memory_table.update_many(grouped)
+
+        # 记录最大的 Cargo 行号，供下次增量更新
+        ids = [int(r["title"]["rowId"]) for r in rows if r["title"].get("rowId")]
+        if ids:
+            if merge:
+                ids.append(self._kv.get("memory_max_id", 0))
+            self._kv["memory_max_id"] = max(ids)
+
     # ------------------------------------------------------
     # 初始化 Cookie
     # ------------------------------------------------------
@@ -119,7 +194,7 @@ class PRTSClient:
 
         url = self.API + "?" + urlencode(params, quote_via=quote)
 
-        r = self.session.get(url, headers=self.BASE_HEADERS)
+        r = self.requester.get(url, headers=self.BASE_HEADERS)
         r.raise_for_status()
 
         data = r.json()
@@ -128,21 +203,31 @@ class PRTSClient:
     # ------------------------------------------------------
     # 全量密录数据（MemoryList同款）
     # ------------------------------------------------------
+    MEMORY_FIELDS = (
+        "_pageName=page,elite,level,favor,"
+        "storySetName,storyIntro,storyTxt,storyIndex,medal,_ID=rowId"
+    )
+
     def get_all_memory(self):
         """返回全量密录数据，优先使用本地缓存"""
+        if self._memory_stale:
+            self._memory_stale = False
+            if self._update_memory():
+                return self.memory_cache
+
         if self.memory_cache is not None:
             return self.memory_cache
 
-        print("⬇ 正在从服务器加载全量密录数据 ...")
+        if self._memory_table:
+            self.memory_cache = [r for _, rows in self._memory_table.items() for r in rows]
+            self._memory_index = None
+            return self.memory_cache
 
-        fields = (
-            "_pageName=page,elite,level,favor,"
-            "storySetName,storyIntro,storyTxt,storyIndex,medal"
-        )
+        print("⬇ 正在从服务器加载全量密录数据 ...")
 
         rows, raw = self.cargoquery(
             tables="char_memory",
-            fields=fields,
+            fields=self.MEMORY_FIELDS,
             limit=5000
         )
 
@@ -150,41 +235,138 @@ class PRTSClient:
 
         # 保存缓存
         self.memory_cache = rows
-        self._save_cache()
+        self._memory_index = None
+        self._store_memory(rows)
 
         return rows
 
+    def warm_memory(self):
+        """仅在密录缓存为空或需要增量更新时下载密录列表
+
+        已有缓存时不整体读入内存，search_memory 仍按干员名直接查询缓存表
+        """
+        if self._memory_stale or not self._memory_table:
+            self.get_all_memory()
+
+    def _update_memory(self) -> bool:
+        """只下载 Cargo 行号大于缓存中最大行号的密录并合并到缓存
+
+        缓存中没有行号（旧版缓存）时返回 False，由调用方全量下载
+        """
+        max_id = self._kv.get("memory_max_id")
+        if max_id is None:
+            self._memory_table.clear()
+            return False
+
+        print("⬇ 正在从服务器加载新增密录数据 ...")
+        rows, raw = self.cargoquery(
+            tables="char_memory",
+            fields=self.MEMORY_FIELDS,
+            where=f"_ID>{int(max_id)}",
+            limit=5000
+        )
+        print(f"✔ 新增 {len(rows)} 条密录记录")
+
+        if rows:
+            self._store_memory(rows, merge=True)
+        self.memory_cache = [r for _, cached in self._memory_table.items() for r in cached]
+        self._memory_index = None
+        return True
+
     # ------------------------------------------------------
     # 搜索某干员密录（完全本地，不请求服务器）
     # ------------------------------------------------------
-    def search_memory(self, name):
+    def search_memory(self, name) -> list[MemoryEntry]:
         """在缓存中搜索 page == 干员名 的密录"""
+        # 全量数据尚未读入内存时直接按干员名查询缓存表
+        if self.memory_cache is None and not self._memory_stale and self._memory_table:
+            return [_to_entry(r) for r in self._memory_table.get(name, ())]
+
         rows = self.get_all_memory()  # 保证已经加载缓存或从服务器获得
 
-        result = [r for r in rows if r["title"]["page"] == name]
-        return result
+        # 首次搜索时把各行展平为 MemoryEntry 并按干员名建立索引，之后每次查询为 O(1)；
+        # memory_cache 与缓存文件仍保持 cargoquery 的原始格式
+        if self._memory_index is None:
+            index = defaultdict(list)
+            for entry in map(_to_entry, rows):
+                index[entry.page].append(entry)
+            self._memory_index = dict(index)
+
+        return list(self._memory_index.get(name, ()))
+
+    def _fetch_story_text(self, story_txt: str) -> str:
+        """返回密录页面的脚本文本，优先使用 body_cache"""
+        content = self.body_cache.get(story_txt)
+        if content is not None:
+            return content
+
+        url = f"{self.HOME}w/{story_txt}"
+        html = self.requester.get(url).text
+        content = _find_datas_txt(html)
+        if content is None:
+            raise ValueError(f"无法找到密录内容的预格式化文本块，页面结构可能已更改: {url}")
+        self.body_cache[story_txt] = content
+        return content
+
+    def _fetch_entry(self, entry: MemoryEntry) -> Story | None:
+        """下载并提取单条密录的脚本文本，失败时返回 None"""
+        try:
+            content = self._fetch_story_text(entry.storyTxt)
+            return Story(
+                name=entry.storySetName,
+                intro=entry.storyIntro,
+                origin_content=content
+            )
+        except Exception as e:
+            print(f"⚠ 获取密录 '{entry.storySetName}' 时出错: {e}")
+            return None
 
     def get_story_content_by_name(self, name: str) -> list[Story]:
         """获取指定干员的未解析密录文本内容"""
         entries = self.search_memory(name)
         stories = []
         for entry in entries:
-            url = f"{self.HOME}w/{entry['title']['storyTxt']}"
-            try:
-                html = self.session.get(url).text
-                soup = BeautifulSoup(html, 'html.parser')
-                content = soup.find("pre", id="datas_txt")
-                if content is None:
-                    raise ValueError(f"无法找到密录内容的预格式化文本块，页面结构可能已更改: {url}")
-                content = content.get_text()
-                story = Story(
-                    name=entry['title']['storySetName'],
-                    intro=entry['title']['storyIntro'],
-                    origin_content=content
-                )
+            story = self._fetch_entry(entry)
+            if story is not None:
                 stories.append(story)
-            except Exception as e:
-                print(f"⚠ 获取密录 '{entry['title']['storySetName']}' 时出错: {e}")
-                continue
 
-        return stories
\ No newline at end of file
+        return stories
+
+    def get_story_contents_by_names(self, names: list[str], max_workers: int = MEMORY_FETCH_WORKERS,
+                                    on_progress=None) -> dict[str, list[Story]]:
+        """批量获取多个干员的密录文本内容，返回 {干员名: [Story]}
+
+        所有干员的密录页面汇总到同一个线程池中并发下载（共享连接池），
+        结果按 names 顺序及各自的密录顺序返回。max_workers 为 1 时顺序下载。
+        on_progress(done, total) 在每条密录下载结束后调用，done 为已完成条数，
+        total 为密录总条数；各次调用互斥，done 依次递增。
+        """
+        names = list(dict.fromkeys(names))
+        entries_by_name = {name: self.search_memory(name) for name in names}
+        all_entries = [entry for entries in entries_by_name.values() for entry in entries]
+
+        fetch = self._fetch_entry
+        if on_progress is not None:
+            total = len(all_entries)
+            done = 0
+            lock = threading.Lock()
+
+            def fetch(entry):
+                nonlocal done
+                story = self._fetch_entry(entry)
+                with lock:
+                    done += 1
+                    on_progress(done, total)
+                return story
+
+        if max_workers <= 1:
+            fetched = iter([fetch(entry) for entry in all_entries])
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as ex:
+                fetched = iter(list(ex.map(fetch, all_entries)))
+
+        result = {}
+        for name, entries in entries_by_name.items():
+            stories = [next(fetched) for _ in entries]
+            result[name] = [s for s in stories if s is not None]
+        return result
@@ -1,158 +1,340 @@
 from __future__ import annotations
 
+from collections import namedtuple
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from typing import Dict, Iterator, List, Optional, Tuple
+
 from bs4 import BeautifulSoup
 from tqdm import tqdm
-from common import Requester, Story
+from common import Requester, Story, find_pre_text
 
-class StoryParser:
-    def __init__(self, requester=None):
-        self.PRTS_ROOT = "https://prts.wiki"
-        self.STORY_URL = f"{self.PRTS_ROOT}/w/剧情一览"
-        self.results = []
-        self.requester = requester or Requester()
-        self._parse()
+try:
+    # 可选依赖：lexbor 是 C 实现的 HTML 解析器，比 html.parser 快一个数量级；
+    # 未安装时退回 BeautifulSoup
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
 
-    def _parse(self):
-        response = self.requester.get(self.STORY_URL)
-        html_content = response.text
-        soup = BeautifulSoup(html_content, "html.parser")
-        # 所有 wikitable 是剧情表
-        tables = soup.find_all("table", class_="wikitable")
+try:
+    # 可选依赖：pyahocorasick 可一次扫描同时匹配多个查询名，未安装时逐个名字做子串查找
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# 查询名达到该数量时才值得构建 Aho-Corasick 自动机
+AHO_CORASICK_MIN_NAMES = 4
+
+# 同一章节内并发下载剧情页面的线程数（Requester 仍按 delay 错开请求发起时间）
+STORY_FETCH_WORKERS = 6
+
+# 剧情表中的一行：(章节名, 剧情类型, [(关卡标题, 链接)])
+_StoryRow = Tuple[str, str, List[Tuple[str, str]]]
+
+# 解析结果：每个章节一个 ChapterEntry，stories 为该章节的 StoryEntry 列表
+StoryEntry = namedtuple("StoryEntry", "title url")
+ChapterEntry = namedtuple("ChapterEntry", "chapter type stories")
+
+
+def chapters_to_json(results: List[ChapterEntry]) -> list:
+    """转换为可 JSON 序列化的 [{"chapter", "type", "stories": [{"title", "url"}]}]"""
+    return [
+        {"chapter": c.chapter, "type": c.type, "stories": [s._asdict() for s in c.stories]}
+        for c in results
+    ]
+
+
+def chapters_from_json(data: list) -> List[ChapterEntry]:
+    """chapters_to_json 的逆操作"""
+    return [
+        ChapterEntry(d["chapter"], d["type"], [StoryEntry(s["title"], s["url"]) for s in d["stories"]])
+        for d in data
+    ]
+
+
+def _iter_rows_bs4(html_content: str) -> Iterator[_StoryRow]:
+    """用 BeautifulSoup 逐行提取剧情一览中的剧情表"""
+    soup = BeautifulSoup(html_content, "html.parser")
+    # 所有 wikitable 是剧情表
+    for table in soup.find_all("table", class_="wikitable"):
+        for row in table.find_all("tr"):
+            ths = row.find_all("th")
+
+            # 跳过非剧情行
+            if len(ths) < 2:
+                continue
+
+            # 只提取存在关卡剧情链接的行
+            tds = row.find_all("td")
+            if not tds:
+                continue
+
+            links = [(a.get_text(strip=True), a.get("href", "")) for a in tds[0].find_all("a")]
+            # 第一列是章节名，第二列是剧情类型
+            yield ths[0].get_text(strip=True), ths[1].get_text(strip=True), links
+
+
+def _iter_rows_lexbor(html_content: str) -> Iterator[_StoryRow]:
+    """与 _iter_rows_bs4 相同，改用 selectolax 的 CSS 选择器"""
+    tree = LexborHTMLParser(html_content)
+    for row in tree.css("table.wikitable tr"):
+        ths = row.css("th")
+        if len(ths) < 2:
+            continue
+
+        tds = row.css("td")
+        if not tds:
+            continue
+
+        links = [(a.text(strip=True), a.attributes.get("href") or "") for a in tds[0].css("a")]
+        yield ths[0].text(strip=True), ths[1].text(strip=True), links
+
+
+def _parse_image_map(back_text: str) -> Dict[str, str]:
+    """解析 datas_back 中每行 "图片ID,图片链接" 的图片映射"""
+    image_map = {}
+    for line in back_text.strip().split('\n'):
+        if ',' in line:
+            parts = line.split(',', 1)
+            if len(parts) == 2:
+                image_id = parts[0].strip()
+                image_url = parts[1].strip()
+                image_map[image_id] = image_url
+    return image_map
+
+
+def _extract_story_bs4(html_content: str) -> Optional[Tuple[str, Dict[str, str]]]:
+    """用 BeautifulSoup 提取剧情脚本与图片映射，找不到正文时返回 None"""
+    soup = BeautifulSoup(html_content, "html.parser")
+
+    # 查找剧情内容，通常在特定的标签中
+    content_div = soup.find("div", class_="mw-parser-output")
+    if not content_div:
+        return None
+
+    # 剧情脚本内容在 <pre id="datas_txt"> 中
+    datas_txt = content_div.find("pre", {"id": "datas_txt"})
+    if datas_txt:
+        # 直接使用剧情脚本内容
+        content = datas_txt.get_text()
+    else:
+        # 如果没有找到 datas_txt，则使用旧的清理逻辑
+        # 移除导航和无关部分
+        for unwanted in content_div.find_all("table"):
+            unwanted.decompose()
+        for unwanted in content_div.find_all("div", class_="navbox"):
+            unwanted.decompose()
+        # 移除其他常见的导航元素，包括 navigation-not-searchable
+        for unwanted in content_div.find_all(class_=["mw-editsection", "toc", "noprint", "navigation-not-searchable"]):
+            unwanted.decompose()
 
-        for table in tables:
-            rows = table.find_all("tr")
+        # 获取文本内容
+        content = content_div.get_text(separator="\n", strip=True)
 
-            for row in rows:
-                ths = row.find_all("th")
+    # 提取图片映射 datas_back
+    datas_back = content_div.find("pre", {"id": "datas_back"})
+    image_map = _parse_image_map(datas_back.get_text()) if datas_back else {}
+    return content, image_map
 
-                # 跳过非剧情行
-                if len(ths) < 2:
-                    continue
 
-                chapter = ths[0].get_text(strip=True)   # 第一列是章节名
-                story_type = ths[1].get_text(strip=True)
+def _extract_story_lexbor(html_content: str) -> Optional[Tuple[str, Dict[str, str]]]:
+    """与 _extract_story_bs4 相同，改用 selectolax 直接定位 pre 块"""
+    content_div = LexborHTMLParser(html_content).css_first("div.mw-parser-output")
+    if content_div is None:
+        return None
+
+    datas_txt = content_div.css_first("pre#datas_txt")
+    if datas_txt is None:
+        # 没有剧情脚本的旧页面很少见，清理逻辑沿用 BeautifulSoup 版本
+        return _extract_story_bs4(html_content)
+
+    datas_back = content_div.css_first("pre#datas_back")
+    image_map = _parse_image_map(datas_back.text()) if datas_back is not None else {}
+    return datas_txt.text(), image_map
+
+
+_iter_rows = _iter_rows_lexbor if LexborHTMLParser is not None else _iter_rows_bs4
+_extract_story_full = _extract_story_lexbor if LexborHTMLParser is not None else _extract_story_bs4
+
+
+def _extract_story(html_content: str) -> Optional[Tuple[str, Dict[str, str]]]:
+    """提取剧情脚本与图片映射；常见页面直接切出 pre 块，不解析整个页面"""
+    content = find_pre_text(html_content, "datas_txt")
+    if content is not None:
+        back_text = find_pre_text(html_content, "datas_back")
+        if back_text is not None:
+            return content, _parse_image_map(back_text)
+        if 'id="datas_back"' not in html_content:
+            return content, {}
+    return _extract_story_full(html_content)
+
 
-                # 只提取存在关卡剧情链接的行
-                tds = row.find_all("td")
-                if not tds:
-                    continue
+class StoryParser:
+    def __init__(self, requester=None, results=None, body_cache=None):
+        """results 为已缓存的解析结果时直接使用，不再请求并解析剧情一览页面
 
-                story_td = tds[0]
+        body_cache 为 {url: {"content": 剧情脚本, "image_map": 图片映射}}，
+        命中时不再下载该剧情页面；新下载的页面也会写入其中
+        """
+        self.PRTS_ROOT = "https://prts.wiki"
+        self.STORY_URL = f"{self.PRTS_ROOT}/w/剧情一览"
+        self.results = []
+        self.requester = requester or Requester()
+        self.body_cache = body_cache if body_cache is not None else {}
+        # 查询结果缓存，results 变化时清空
+        self._chapter_lookup = {}
+        self._story_lookup = {}
+        if results is not None:
+            self.parse_from_cached_results(results)
+        else:
+            self._parse()
 
-                # 提取关卡剧情标题 + 链接
-                stories = []
-                for a in story_td.find_all("a"):
-                    title = a.get_text(strip=True)
-                    href = a.get("href", "")
+    def parse_from_cached_results(self, results):
+        """使用缓存的解析结果（与 get_all_results 的格式相同，即 ChapterEntry 列表）"""
+        self.results = results
+        self._chapter_lookup.clear()
+        self._story_lookup.clear()
 
-                    stories.append({
-                        "title": title,
-                        "url": f"{self.PRTS_ROOT}/{href}"
-                    })
+    def _parse(self):
+        """请求剧情一览页面并解析全部剧情表"""
+        self.results = []
+        self._chapter_lookup.clear()
+        self._story_lookup.clear()
+        response = self.requester.get(self.STORY_URL)
+        for chapter, story_type, links in _iter_rows(response.text):
+            # 提取关卡剧情标题 + 链接
+            stories = [StoryEntry(title, f"{self.PRTS_ROOT}/{href}") for title, href in links]
 
-                # 保存章节
-                self.results.append({
-                    "chapter": chapter,
-                    "type": story_type,
-                    "stories": stories
-                })
+            # 保存章节
+            self.results.append(ChapterEntry(chapter, story_type, stories))
 
     def search_by_chapter(self, chapter_name):
         """通过章节名搜索，返回匹配的章节数据"""
-        for result in self.results:
-            if chapter_name in result["chapter"]:
-                return result
-        return None
+        if chapter_name in self._chapter_lookup:
+            return self._chapter_lookup[chapter_name]
+
+        found = next((r for r in self.results if chapter_name in r.chapter), None)
+        self._chapter_lookup[chapter_name] = found
+        return found
 
     def search_by_story(self, story_name):
         """通过关卡名搜索，返回匹配的故事数据"""
+        if story_name in self._story_lookup:
+            return self._story_lookup[story_name]
+
+        found = None
         for result in self.results:
-            for story in result["stories"]:
-                if story_name in story["title"]:
-                    return {
-                        "chapter": result["chapter"],
+            for story in result.stories:
+                if story_name in story.title:
+                    found = {
+                        "chapter": result.chapter,
                         "story": story
                     }
-        return None
+                    break
+            if found is not None:
+                break
+        self._story_lookup[story_name] = found
+        return found
+
+    def prime_lookups(self, names):
+        """一次扫描所有章节名与关卡名，预先填好多个名字的 search_by_chapter / search_by_story 结果
+
+        需要安装 pyahocorasick 且名字不少于 AHO_CORASICK_MIN_NAMES 个，否则不做任何事，
+        之后的查询照常逐个进行
+        """
+        pending = [n for n in dict.fromkeys(names) if n and n not in self._chapter_lookup]
+        if ahocorasick is None or len(pending) < AHO_CORASICK_MIN_NAMES:
+            return
+
+        automaton = ahocorasick.Automaton()
+        for name in pending:
+            automaton.add_word(name, name)
+        automaton.make_automaton()
+
+        # 与逐个查询一致，每个名字只保留按顺序的第一个匹配
+        chapters = {}
+        stories = {}
+        for result in self.results:
+            for _, hit in automaton.iter(result.chapter):
+                chapters.setdefault(hit, result)
+            for story in result.stories:
+                for _, hit in automaton.iter(story.title):
+                    if hit not in stories:
+                        stories[hit] = {"chapter": result.chapter, "story": story}
+
+        for name in pending:
+            self._chapter_lookup[name] = chapters.get(name)
+            self._story_lookup.setdefault(name, stories.get(name))
 
     def get_all_results(self):
         """获取所有解析结果"""
         return self.results
 
-    def get_story_content_by_name(self, name: str) -> list[Story]:
-        """通过章节名搜索并下载该章节下的所有剧情内容"""
+    def _fetch_story_text(self, url: str) -> Optional[Tuple[str, Dict[str, str]]]:
+        """返回剧情页面的脚本与图片映射，优先使用 body_cache，找不到正文时返回 None"""
+        cached = self.body_cache.get(url)
+        if cached is not None:
+            return cached["content"], cached["image_map"]
+
+        response = self.requester.get(url)
+        extracted = _extract_story(response.text)
+        if extracted is not None:
+            content, image_map = extracted
+            self.body_cache[url] = {"content": content, "image_map": image_map}
+        return extracted
+
+    def _fetch_and_parse(self, story: StoryEntry) -> Optional[Story]:
+        """下载并提取单个剧情页面，失败时返回 None"""
+        url = story.url
+        try:
+            extracted = self._fetch_story_text(url)
+            if extracted is None:
+                print(f"⚠ 无法在页面中找到剧情内容: {url}")
+                return None
+            content, image_map = extracted
+            return Story(name=story.title, origin_content=content, image_map=image_map)
+        except Exception as e:
+            print(f"⚠ 获取故事 '{story.title}' 时出错: {e}")
+            return None
+
+    def get_story_content_by_name(self, name: str, max_workers: int = STORY_FETCH_WORKERS,
+                                  executor: Optional[Executor] = None,
+                                  show_progress: bool = True) -> list[Story]:
+        """通过章节名搜索并下载该章节下的所有剧情内容
+
+        剧情页面在线程池中并发下载，结果仍按章节内的顺序返回。
+        给定 executor 时页面下载提交到该线程池（由调用方负责关闭），
+        否则临时创建 max_workers 个线程的线程池；show_progress 为 False 时不显示进度条
+        """
         result = self.search_by_chapter(name)
         if not result:
             return []
 
-        stories = []
         # 添加进度条，显示章节名
         chapter_display = f"{name[:12]}" if len(name) > 12 else f"{name:<12}"
         bar_format = f" {chapter_display}  [{{bar:20}}] {{percentage:3.0f}}% ({{n}}/{{total}}) | {{rate_fmt}}"
 
+        chapter_stories = result.stories
+        fetched: List[Optional[Story]] = [None] * len(chapter_stories)
+        pool = (ThreadPoolExecutor(max_workers=max(1, max_workers)) if executor is None
+                else nullcontext(executor))
         with tqdm(
-            total=len(result["stories"]),
+            total=len(chapter_stories),
             desc="",
             unit="",
             ncols=80,
             bar_format=bar_format,
+            disable=not show_progress,
             leave=True,
             position=0
-        ) as pbar:
-            for story in result["stories"]:
-                url = story["url"]
-                try:
-                    response = self.requester.get(url)
-                    html_content = response.text
-                    soup = BeautifulSoup(html_content, "html.parser")
-
-                    # 查找剧情内容，通常在特定的标签中
-                    content_div = soup.find("div", class_="mw-parser-output")
-                    if not content_div:
-                        print(f"⚠ 无法在页面中找到剧情内容: {url}")
-                        pbar.update(1)
-                        continue
-
-                    # 剧情脚本内容在 <pre id="datas_txt"> 中
-                    datas_txt = content_div.find("pre", {"id": "datas_txt"})
-                    if datas_txt:
-                        # 直接使用剧情脚本内容
-                        content = datas_txt.get_text()
-                    else:
-                        # 如果没有找到 datas_txt，则使用旧的清理逻辑
-                        # 移除导航和无关部分
-                        for unwanted in content_div.find_all("table"):
-                            unwanted.decompose()
-                        for unwanted in content_div.find_all("div", class_="navbox"):
-                            unwanted.decompose()
-                        # 移除其他常见的导航元素，包括 navigation-not-searchable
-                        for unwanted in content_div.find_all(class_=["mw-editsection", "toc", "noprint", "navigation-not-searchable"]):
-                            unwanted.decompose()
-
-                        # 获取文本内容
-                        content = content_div.get_text(separator="\n", strip=True)
-
-                    # 提取图片映射 datas_back
-                    image_map = {}
-                    datas_back = content_div.find("pre", {"id": "datas_back"})
-                    if datas_back:
-                        back_text = datas_back.get_text()
-                        for line in back_text.strip().split('\n'):
-                            if ',' in line:
-                                parts = line.split(',', 1)
-                                if len(parts) == 2:
-                                    image_id = parts[0].strip()
-                                    image_url = parts[1].strip()
-                                    image_map[image_id] = image_url
-
-                    story_obj = Story(name=story["title"], origin_content=content, image_map=image_map)
-                    stories.append(story_obj)
-
-                    # 更新进度条
-                    pbar.update(1)
-                except Exception as e:
-                    print(f"⚠ 获取故事 '{story['title']}' 时出错: {e}")
-                    pbar.update(1)
-                    continue
-
-        return stories
+        ) as pbar, pool as ex:
+            futures = {
+                ex.submit(self._fetch_and_parse, story): idx
+                for idx, story in enumerate(chapter_stories)
+            }
+            for future in as_completed(futures):
+                fetched[futures[future]] = future.result()
+                # 更新进度条
+                pbar.update(1)
+
+        return [story for story in fetched if story is not None]
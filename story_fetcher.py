@@ -14,13 +14,12 @@ story_fetcher.py
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import re
 import sys
 import time
-from datetime import datetime
-from typing import List, Set
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Iterator, List, Optional, Set, Tuple
 
 # 设置 UTF-8 编码输出（Windows 兼容）
 if sys.platform == 'win32':
@@ -31,10 +30,10 @@ if sys.platform == 'win32':
         pass
 
 from tqdm import tqdm
-from common import Requester, Story, load_names
+from common import CacheStore, Requester, Story, load_json_cache, load_names
 from parse_text_to_docx import DocumentAssembler
-from search_memory import PRTSClient
-from search_story import StoryParser
+from search_memory import MEMORY_FETCH_WORKERS, PRTSClient
+from search_story import STORY_FETCH_WORKERS, StoryParser, chapters_from_json, chapters_to_json
 
 
 # ============================================
@@ -68,52 +67,67 @@ class Colors:
     BRIGHT_WHITE = '\033[97m'
 
 
+# 输出被重定向到文件等非终端时不输出颜色代码
+if not sys.stdout.isatty():
+    for _attr in [a for a in vars(Colors) if a.isupper()]:
+        setattr(Colors, _attr, '')
+    del _attr
+
+_SEPARATOR = f"{Colors.DIM}{'─' * 60}{Colors.RESET}"
+
+
 def print_separator(width=60):
     """打印分隔线"""
-    print(f"{Colors.DIM}{'─' * width}{Colors.RESET}")
+    print(_SEPARATOR if width == 60 else f"{Colors.DIM}{'─' * width}{Colors.RESET}")
 
 
 def print_timestamp_log(emoji, message, color=Colors.CYAN):
     """打印带时间戳的日志"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
     print(f"{Colors.DIM}[{timestamp}]{Colors.RESET} {emoji} {color}{message}{Colors.RESET}")
 
 
 def print_task_header(names: List[str], mode: str, output: str):
-    """打印任务开始横幅"""
-    print()
-    print(f"{Colors.BOLD}{Colors.CYAN}🔄 故事下载任务开始{Colors.RESET}")
-    print_separator()
-    print(f"{Colors.BOLD}任务配置:{Colors.RESET}")
-
+    """打印任务开始横幅（整段一次写出）"""
     # 故事列表
     stories_display = ", ".join(names) if len(names) <= 3 else f"{', '.join(names[:3])}, ... (共{len(names)}个)"
-    print(f"  {Colors.DIM}·{Colors.RESET} 故事: {Colors.YELLOW}{stories_display}{Colors.RESET}")
-    print(f"  {Colors.DIM}·{Colors.RESET} 模式: {Colors.YELLOW}{mode}{Colors.RESET}")
-    print(f"  {Colors.DIM}·{Colors.RESET} 目标: {Colors.YELLOW}{output}{Colors.RESET}")
-    print_separator()
+    bullet = f"  {Colors.DIM}·{Colors.RESET}"
+    sys.stdout.write("\n".join([
+        "",
+        f"{Colors.BOLD}{Colors.CYAN}🔄 故事下载任务开始{Colors.RESET}",
+        _SEPARATOR,
+        f"{Colors.BOLD}任务配置:{Colors.RESET}",
+        f"{bullet} 故事: {Colors.YELLOW}{stories_display}{Colors.RESET}",
+        f"{bullet} 模式: {Colors.YELLOW}{mode}{Colors.RESET}",
+        f"{bullet} 目标: {Colors.YELLOW}{output}{Colors.RESET}",
+        _SEPARATOR,
+        "",
+    ]))
 
 
 def print_task_summary(total_stories: int, elapsed_time: float, output_path: str):
-    """打印任务总结"""
-    print_separator()
-    print(f"{Colors.BOLD}{Colors.GREEN}✅ 所有任务完成！{Colors.RESET}")
-
+    """打印任务总结（整段一次写出）"""
     # 格式化耗时
     minutes = int(elapsed_time // 60)
     seconds = int(elapsed_time % 60)
     time_str = f"{minutes}分{seconds}秒" if minutes > 0 else f"{seconds}秒"
 
-    print(f" {Colors.DIM}总计:{Colors.RESET} {Colors.CYAN}{total_stories}{Colors.RESET} 个故事 | "
-          f"{Colors.DIM}总耗时:{Colors.RESET} {Colors.CYAN}{time_str}{Colors.RESET}")
-    print(f" {Colors.DIM}输出文件:{Colors.RESET} {Colors.GREEN}{output_path}{Colors.RESET} (已保存)")
-    print()
+    sys.stdout.write("\n".join([
+        _SEPARATOR,
+        f"{Colors.BOLD}{Colors.GREEN}✅ 所有任务完成！{Colors.RESET}",
+        f" {Colors.DIM}总计:{Colors.RESET} {Colors.CYAN}{total_stories}{Colors.RESET} 个故事 | "
+        f"{Colors.DIM}总耗时:{Colors.RESET} {Colors.CYAN}{time_str}{Colors.RESET}",
+        f" {Colors.DIM}输出文件:{Colors.RESET} {Colors.GREEN}{output_path}{Colors.RESET} (已保存)",
+        "",
+        "",
+    ]))
 
 
 class StoryPRTSClient:
     """故事客户端，封装 StoryParser 的功能，提供缓存和便捷接口"""
     
-    CACHE_FILE = "story_cache.json"
+    CACHE_FILE = "story_cache.json"    # 旧版 JSON 缓存，仅在首次使用 DB_FILE 时导入
+    DB_FILE = "story_cache.sqlite"
 
     def __init__(self, use_cache=True, requester=None):
         self.requester = requester or Requester()
@@ -122,54 +136,71 @@ class StoryPRTSClient:
         
         self.story_cache = None  # 全量故事缓存
         self.parser = None       # StoryParser 实例
+        self._resolved = {}      # 已下载的章节 {章节名: [Story]}
+
+        self.db = CacheStore(self.DB_FILE)
+        self._kv = self.db.table("kv")            # 剧情一览解析结果
+        self.body_cache = self.db.table("body")   # 剧情页面缓存 {url: {"content", "image_map"}}
         
         if use_cache:
             self._load_cache()
+        else:
+            self.db.clear()
     
     # ------------------------------------------------------
     # 缓存系统
     # ------------------------------------------------------
     def _load_cache(self):
-        """加载本地缓存"""
-        if not os.path.exists(self.CACHE_FILE):
-            return
-
+        """加载本地缓存（剧情页面正文按需查询，不整体读入内存）"""
         try:
-            with open(self.CACHE_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            if not self._kv and os.path.exists(self.CACHE_FILE):
+                self._import_json_cache()
 
             # 故事数据
-            if "stories" in data:
-                self.story_cache = data["stories"]
+            stories = self._kv.get("stories")
+            if stories is not None:
+                self.story_cache = chapters_from_json(stories)
                 print_timestamp_log("🔍", f"已加载 {len(self.story_cache)} 条缓存记录")
                 self.initialized = True
 
         except Exception as e:
             print_timestamp_log("⚠️", f"无法读取缓存: {e}", Colors.YELLOW)
+
+    def _import_json_cache(self):
+        """把旧版 story_cache.json 导入 sqlite 缓存"""
+        data = load_json_cache(self.CACHE_FILE)
+        if "stories" in data:
+            self._kv["stories"] = data["stories"]
+        if "story_bodies" in data:
+            self.body_cache.update_many(data["story_bodies"])
+        self._kv["json_imported"] = True
+        print_timestamp_log("🔍", f"已从 {self.CACHE_FILE} 导入缓存")
     
     def _save_cache(self):
-        """保存缓存文件"""
-        data = {}
-        
-        # 保存故事
+        """保存剧情一览解析结果（剧情页面正文在下载时已逐条写入）"""
         if self.story_cache is not None:
-            data["stories"] = self.story_cache
-        
-        with open(self.CACHE_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
+            self._kv["stories"] = chapters_to_json(self.story_cache)
         print("💾 缓存已保存。")
     
     # ------------------------------------------------------
     # 初始化解析器
     # ------------------------------------------------------
     def _init_parser(self):
-        """初始化 StoryParser，如果已初始化则跳过"""
+        """初始化 StoryParser，如果已初始化则跳过
+
+        已有故事缓存时直接交给解析器，不再请求剧情一览页面
+        """
         if self.parser is not None:
             return
 
+        self.parser = StoryParser(requester=self.requester, results=self.story_cache,
+                                  body_cache=self.body_cache)
         print_timestamp_log("⚙️", "故事解析器初始化成功")
-        self.parser = StoryParser(requester=self.requester)
+
+        # 刚刚重新抓取了剧情一览，保存下来供之后的运行使用
+        if self.story_cache is None:
+            self.story_cache = self.parser.get_all_results()
+            self._save_cache()
     
     # ------------------------------------------------------
     # 全量故事数据
@@ -181,15 +212,12 @@ class StoryPRTSClient:
         
         print("⬇ 正在从服务器加载全量故事数据 ...")
         
+        # _init_parser 在抓取后会设置并保存 story_cache
         self._init_parser()
-        results = self.parser.get_all_results()
+        results = self.story_cache
         
         print(f"✔ 已获取 {len(results)} 条故事记录")
         
-        # 保存缓存
-        self.story_cache = results
-        self._save_cache()
-        
         return results
     
     # ------------------------------------------------------
@@ -202,52 +230,73 @@ class StoryPRTSClient:
         matches = []
         for result in results:
             # 检查章节名
-            if name in result["chapter"]:
+            if name in result.chapter:
                 matches.append({
                     "type": "chapter",
-                    "chapter": result["chapter"],
-                    "type_name": result["type"],
-                    "stories": result["stories"]
+                    "chapter": result.chapter,
+                    "type_name": result.type,
+                    "stories": result.stories
                 })
             # 检查故事标题
-            for story in result["stories"]:
-                if name in story["title"]:
+            for story in result.stories:
+                if name in story.title:
                     matches.append({
                         "type": "story",
-                        "chapter": result["chapter"],
-                        "type_name": result["type"],
+                        "chapter": result.chapter,
+                        "type_name": result.type,
                         "story": story
                     })
         
         return matches
     
-    def get_story_content_by_name(self, name: str) -> list[Story]:
+    def prime_names(self, names: List[str]):
+        """批量查询多个名称前调用，一次扫描预先解析所有名称对应的章节"""
+        self._init_parser()
+        self.parser.prime_lookups(names)
+
+    def get_story_content_by_name(self, name: str, executor: Optional[Executor] = None,
+                                  show_progress: bool = True) -> list[Story]:
         """获取指定名称的故事内容（通过章节名或故事名）
         
         如果找到章节，返回该章节下的所有故事
         如果找到故事，返回该故事所在章节下的所有故事
+        executor、show_progress 原样传给 StoryParser.get_story_content_by_name
         """
         self._init_parser()
         
         # 先尝试通过章节名搜索
-        chapter_result = self.parser.search_by_chapter(name)
-        if chapter_result:
-            return self.parser.get_story_content_by_name(name)
-        
-        # 如果章节名没找到，尝试通过故事名搜索
-        story_result = self.parser.search_by_story(name)
-        if story_result:
-            # 找到故事后，获取该故事所在章节的所有故事
-            chapter_name = story_result["chapter"]
-            return self.parser.get_story_content_by_name(chapter_name)
+        chapter_name = None
+        if self.parser.search_by_chapter(name):
+            chapter_name = name
+        else:
+            # 如果章节名没找到，尝试通过故事名搜索
+            story_result = self.parser.search_by_story(name)
+            if story_result:
+                # 找到故事后，获取该故事所在章节的所有故事
+                chapter_name = story_result["chapter"]
         
         # 都没找到
-        return []
+        if chapter_name is None:
+            return []
+
+        # 章节名与该章节内的故事名会解析到同一章节，只下载一次
+        if chapter_name not in self._resolved:
+            self._resolved[chapter_name] = self.parser.get_story_content_by_name(
+                chapter_name, executor=executor, show_progress=show_progress)
+        return list(self._resolved[chapter_name])
 
 
 # ------------------------------------------------------
 # 角色名称提取和秘录获取
 # ------------------------------------------------------
+# 一次扫描同时匹配 Markdown 格式 **角色名:** 与游戏脚本格式 name="角色名"]
+# （[name="角色名"] 是后者的子集，无需单独匹配）
+_CHARACTER_NAME_RE = re.compile(r'\*\*(?P<md>[^*:：]+?)[:：]\*\*|name\s*=\s*"(?P<script>[^"]+)"\]')
+
+# 删除这些字符的转换表：含这些字符的多为音效、场景标记，而非角色名
+_NAME_REJECT_TABLE = str.maketrans('', '', '<>()[]')
+
+
 def extract_character_names(story_content: str) -> Set[str]:
     """从故事文本中提取角色名称
     
@@ -255,65 +304,48 @@ def extract_character_names(story_content: str) -> Set[str]:
     1. Markdown 格式: **角色名:** 或 **角色名：**
     2. 游戏脚本格式: [name="角色名"] 或 name="角色名"]
     """
-    names = set()
-    
-    # 模式1: Markdown 格式 **角色名:** 或 **角色名：**
-    pattern1 = r'\*\*([^*:：]+?)[:：]\*\*'
-    matches1 = re.findall(pattern1, story_content)
-    names.update(name.strip() for name in matches1 if name.strip())
-    
-    # 模式2: 游戏脚本格式 [name="角色名"]对话内容
-    pattern2 = r'\[name\s*=\s*"([^"]+)"\]'
-    matches2 = re.findall(pattern2, story_content)
-    names.update(name.strip() for name in matches2 if name.strip())
-    
-    # 模式3: 游戏脚本格式 name="角色名"]对话内容 (缺少开括号)
-    pattern3 = r'name\s*=\s*"([^"]+)"\]'
-    matches3 = re.findall(pattern3, story_content)
-    names.update(name.strip() for name in matches3 if name.strip())
-    
-    # 过滤掉一些明显不是角色名的内容（如音效、场景描述等）
-    filtered_names = set()
-    for name in names:
-        # 跳过太短的名字（可能是标点符号）
-        if len(name) < 2:
-            continue
-        # 跳过包含特殊符号的（可能是音效标记），但允许游戏脚本格式中的引号
-        if any(c in name for c in ['<', '>', '(', ')', '[', ']']):
-            continue
-        filtered_names.add(name)
-    
-    return filtered_names
+    candidates = (
+        (m.group('md') or m.group('script')).strip()
+        for m in _CHARACTER_NAME_RE.finditer(story_content)
+    )
+    # 跳过太短的名字（可能是标点符号）与包含特殊符号的（可能是音效标记），
+    # 但允许游戏脚本格式中的引号；translate 后长度变化即说明含有特殊符号
+    return {
+        name for name in candidates
+        if len(name) >= 2 and len(name.translate(_NAME_REJECT_TABLE)) == len(name)
+    }
 
 
 def get_characters_memory(memory_client: PRTSClient, character_names: Set[str], verbose: bool = False) -> dict:
     """获取多个角色的秘录
 
+    所有角色的秘录页面交给 PRTSClient 的线程池并发下载
     返回: {角色名: [Story对象列表]}
     """
-    result = {}
-    # 添加进度条
+    names = sorted(character_names)
+    # 添加进度条（秘录总条数在查到各角色的秘录后才确定）
     desc = f"{'秘录':<6} [获取中...]"
     with tqdm(
-        total=len(character_names),
+        total=0,
         desc=desc,
-        unit="个",
+        unit="条",
         ncols=100,
         disable=not verbose,
         leave=True,
         position=0
     ) as pbar:
-        for char_name in character_names:
-            try:
-                memories = memory_client.get_story_content_by_name(char_name)
-                if memories:
-                    result[char_name] = memories
-                pbar.update(1)
-            except Exception as e:
-                if verbose:
-                    print(f"  ✗ 获取角色 '{char_name}' 的秘录时出错: {e}")
-                pbar.update(1)
-    return result
+        def on_progress(done, total):
+            pbar.total = total
+            pbar.update(done - pbar.n)
+
+        try:
+            fetched = memory_client.get_story_contents_by_names(
+                names, max_workers=MEMORY_FETCH_WORKERS, on_progress=on_progress)
+        except Exception as e:
+            if verbose:
+                print(f"  ✗ 获取角色秘录时出错: {e}")
+            return {}
+    return {name: memories for name, memories in fetched.items() if memories}
 
 
 def append_memory_to_content(asm: DocumentAssembler, memory_dict: dict, verbose: bool = False):
@@ -339,10 +371,53 @@ def append_memory_to_content(asm: DocumentAssembler, memory_dict: dict, verbose:
                     print(f"    已附加秘录: {full_title}")
 
 
+def _story_entries(name: str, stories: List[Story], verbose: bool, title_prefix: str = "") -> list:
+    """把章节内的故事整理成 parse_texts 所需的 (标题, 文本, 图片映射)，跳过空内容"""
+    entries = []
+    for idx, s in enumerate(stories, start=1):
+        title = s.name or f"{name} #{idx}"
+        origin = s.origin_content
+        if origin and origin.strip():
+            entries.append((f"{title_prefix}{title}", origin, s.image_map or {}))
+        elif verbose:
+            print(f"{name} 的条目 `{title}` 内容为空，已跳过")
+    return entries
+
+
+def _prefetch_stories(client: StoryPRTSClient, names: List[str]) -> Iterator[Tuple[str, Future]]:
+    """按顺序产出 (名称, 下载该名称故事的 Future)
+
+    调用方处理当前名称（解析、生成文档）时，后台线程已在下载下一个名称的故事，
+    使网络等待与解析重叠。下载出错时异常在 Future.result() 处抛出
+
+    所有章节的页面下载共用一个线程池，后台线程只负责提交并等待下一个章节的页面。
+    后台下载时不显示逐章节的进度条（会与解析阶段的输出交错），
+    改由主线程按处理完的章节数更新一个总进度条
+    """
+    with ThreadPoolExecutor(max_workers=STORY_FETCH_WORKERS) as pages, \
+            ThreadPoolExecutor(max_workers=1) as ex, \
+            tqdm(total=len(names), unit="章", ncols=80, leave=True, position=0) as pbar:
+        def fetch(name: str) -> List[Story]:
+            return client.get_story_content_by_name(name, executor=pages, show_progress=False)
+
+        future = ex.submit(fetch, names[0]) if names else None
+        for idx, name in enumerate(names):
+            current = future
+            if idx + 1 < len(names):
+                future = ex.submit(fetch, names[idx + 1])
+            yield name, current
+            pbar.update(1)
+
+
 def save_per_chapter(client: StoryPRTSClient, name: str, out_dir: str, verbose: bool,
-                     with_memory: bool = False, memory_client: PRTSClient = None, config=None):
-    """为每个章节/故事单独生成 docx 文件"""
-    stories = client.get_story_content_by_name(name)
+                     with_memory: bool = False, memory_client: PRTSClient = None, config=None,
+                     stories: List[Story] = None):
+    """为每个章节/故事单独生成 docx 文件
+
+    stories 为已下载的故事时直接使用，否则通过 client 下载
+    """
+    if stories is None:
+        stories = client.get_story_content_by_name(name)
     if not stories:
         if verbose:
             print(f"未找到 `{name}` 的故事，跳过")
@@ -355,7 +430,8 @@ def save_per_chapter(client: StoryPRTSClient, name: str, out_dir: str, verbose:
     outpath = os.path.join(out_dir, f"{safe_name}_story.docx")
 
     asm = DocumentAssembler(config=config)
-    included = 0
+    entries = _story_entries(name, stories, verbose)
+    included = len(entries)
     all_character_names = set()  # 收集所有故事中的角色名
 
     # 添加大标题（章节名）
@@ -365,7 +441,7 @@ def save_per_chapter(client: StoryPRTSClient, name: str, out_dir: str, verbose:
     chapter_display = f"{name[:18]}" if len(name) > 18 else name
     desc = f"{'解析':<6} [{chapter_display}]"
     with tqdm(
-        total=len(stories),
+        total=len(entries),
         desc=desc,
         unit="个",
         ncols=100,
@@ -373,25 +449,18 @@ def save_per_chapter(client: StoryPRTSClient, name: str, out_dir: str, verbose:
         leave=True,
         position=0
     ) as pbar:
-        for idx, s in enumerate(stories, start=1):
-            title = getattr(s, 'name', None) or f"{name} #{idx}"
-            origin = getattr(s, 'origin_content', None)
-            image_map = getattr(s, 'image_map', {})
-            if origin and origin.strip():
-                asm.parse_text(origin, title=title, image_map=image_map)
-                included += 1
-
-                # 如果启用了秘录功能，提取角色名
-                if with_memory and memory_client:
-                    char_names = extract_character_names(origin)
-                    all_character_names.update(char_names)
-
-                pbar.update(1)
-            else:
-                if verbose:
-                    print(f"{name} 的条目 `{title}` 内容为空，已跳过")
+        def tracked():
+            # 逐条交给 parse_texts，每解析完一条推进进度条
+            for entry in entries:
+                yield entry
                 pbar.update(1)
 
+        asm.parse_texts(tracked())
+
+    # 如果启用了秘录功能，一次扫描所有故事文本提取角色名
+    if with_memory and memory_client:
+        all_character_names = extract_character_names("\n".join(text for _, text, _ in entries))
+
     # 附加秘录
     if with_memory and memory_client and all_character_names:
         if verbose:
@@ -431,21 +500,14 @@ def save_combined(client: StoryPRTSClient, names: List[str], outpath: str, verbo
     all_character_names = set()  # 收集所有故事中的角色名
     first_section = True  # 标记是否为第一个章节
 
-    # 计算总故事数并预先获取所有故事
+    # 下载与解析交替进行：解析当前章节时后台下载下一个章节（进度按章节显示）
     print()
     print(f"{Colors.BOLD}下载进度:{Colors.RESET}")
-    chapters_data = []
-    for name in names:
-        stories = client.get_story_content_by_name(name)
-        if stories:
-            chapters_data.append((name, stories))
-
-    # 计算总故事数
-    total_stories = sum(len(stories) for _, stories in chapters_data)
+    for name, future in _prefetch_stories(client, names):
+        stories = future.result()
+        if not stories:
+            continue
 
-    # 解析阶段 - 不显示进度条，静默处理
-    print_separator()
-    for chapter_idx, (name, stories) in enumerate(chapters_data, 1):
         # 如果是第一个章节，添加大标题
         if first_section and names:
             # 使用第一个章节名作为大标题，如果有多个章节则显示合并标题
@@ -456,23 +518,17 @@ def save_combined(client: StoryPRTSClient, names: List[str], outpath: str, verbo
                 asm.add_main_title(name)
             first_section = False
 
-        for idx, s in enumerate(stories, start=1):
-            title = getattr(s, 'name', None) or f"{name} #{idx}"
-            # 格式: 章节名：故事标题（每条故事都包含章节名）
-            full_title = f"{name}：{title}"
-            origin = getattr(s, 'origin_content', None)
-            image_map = getattr(s, 'image_map', {})
-            if origin and origin.strip():
-                asm.parse_text(origin, title=full_title, image_map=image_map)
-                total_included += 1
-
-                # 如果启用了秘录功能，提取角色名
-                if with_memory and memory_client:
-                    char_names = extract_character_names(origin)
-                    all_character_names.update(char_names)
-            else:
-                if verbose:
-                    print(f"{name} 的条目 `{title}` 内容为空，已跳过")
+        # 格式: 章节名：故事标题（每条故事都包含章节名）
+        entries = _story_entries(name, stories, verbose, title_prefix=f"{name}：")
+        asm.parse_texts(entries)
+        total_included += len(entries)
+
+        # 如果启用了秘录功能，一次扫描本章节所有故事文本提取角色名
+        if with_memory and memory_client and entries:
+            all_character_names.update(
+                extract_character_names("\n".join(text for _, text, _ in entries)))
+
+    print_separator()
 
     # 附加秘录
     if with_memory and memory_client and all_character_names:
@@ -516,7 +572,8 @@ def main():
     parser.add_argument("-f", "--names-file", help="从文件读取章节名或故事名，每行一个")
     parser.add_argument("--combined", action="store_true", help="将所有章节/故事合并到一个 docx 文件（默认按章节输出）")
     parser.add_argument("-o", "--out", help="输出文件或目录。若 --combined 则为输出文件路径，否则为输出目录（默认: 当前目录）")
-    parser.add_argument("--no-cache", action="store_true", help="不使用本地缓存，强制从服务器拉取")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="不使用本地故事缓存，强制从服务器重新拉取剧情一览与剧情正文（不影响秘录缓存）")
     parser.add_argument("--with-memory", action="store_true", help="提取剧情中的角色名并附加相关角色的秘录")
     parser.add_argument("--config", help="解析器配置文件路径 (YAML/JSON)")
     parser.add_argument("-v", "--verbose", action="store_true", help="显示更多调试信息")
@@ -527,7 +584,9 @@ def main():
     except (RuntimeError, ValueError) as exc:
         parser.error(str(exc))
 
-    client = StoryPRTSClient(use_cache=not args.no_cache)
+    # 故事与秘录客户端共用同一个 Requester（同一连接池与速率控制）
+    requester = Requester()
+    client = StoryPRTSClient(use_cache=not args.no_cache, requester=requester)
 
     # Load parser configuration if specified
     parser_config = None
@@ -544,13 +603,32 @@ def main():
     memory_client = None
     if args.with_memory:
         try:
-            memory_client = PRTSClient()
+            memory_client = PRTSClient(requester=requester)
             if args.verbose:
                 print("✓ 秘录客户端已初始化")
         except Exception as e:
             print(f"⚠ 初始化秘录客户端失败: {e}，将跳过秘录功能")
             args.with_memory = False
 
+    # 并行预热：剧情一览与密录列表（缓存为空时需下载并保存）的网络等待相互重叠
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        warmups = [("预先加载剧情一览", ex.submit(client.get_all_story))]
+        if memory_client is not None:
+            warmups.append(("预先加载秘录列表", ex.submit(memory_client.warm_memory)))
+        for label, future in warmups:
+            try:
+                future.result()
+            except Exception as e:
+                if args.verbose:
+                    print(f"⚠ {label}失败: {e}")
+
+    # 名字较多时一次性解析所有名字对应的章节
+    try:
+        client.prime_names(names)
+    except Exception as e:
+        if args.verbose:
+            print(f"⚠ 预先解析名称失败: {e}")
+
     # 如果用户请求合并输出
     if args.combined:
         outpath = args.out if args.out else "combined_story.docx"
@@ -568,11 +646,11 @@ def main():
     # per-chapter 输出（默认）
     out_dir = args.out if args.out else os.getcwd()
     total = 0
-    for name in names:
+    for name, future in _prefetch_stories(client, names):
         try:
             c = save_per_chapter(client, name, out_dir, verbose=args.verbose,
                                with_memory=args.with_memory, memory_client=memory_client,
-                               config=parser_config)
+                               config=parser_config, stories=future.result())
             total += c
         except Exception as e:
             print(f"为 `{name}` 生成文件出错:", e)